@@ -0,0 +1,263 @@
+"""Headless benchmarks for the game's hot paths.
+
+    python -m benchmarks.run                       # print timings
+    python -m benchmarks.run --out bench.json      # save them as JSON
+    python -m benchmarks.run --compare bench.json  # flag regressions
+
+Runs under the SDL dummy video driver with fixed seeds, so results are
+comparable between runs on the same machine.
+"""
+import argparse
+import itertools
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import numpy as np
+import pygame
+
+from engine.settings import WIDTH, HEIGHT, TILE, INFO_BAR_HEIGHT
+from engine.grid import Grid
+from engine.mazegen import make_maze, add_loops
+from engine.pathing import get_reachable_tiles
+from engine.world import World
+from render.camera import Camera
+from render.maze_layer import MazeLayer, ChunkedMazeLayer
+from render.present import Presenter
+from render.scene import PlayScene
+from render.text_cache import TextCache
+
+SEED = 1234
+BENCHMARKS = []
+
+
+def benchmark(name, number):
+    """Register fn(setup_result) to be timed number times per repeat."""
+    def register(fn):
+        BENCHMARKS.append((name, number, fn))
+        return fn
+    return register
+
+
+for _size in (21, 101, 501, 1001):
+    @benchmark(f"make_maze/{_size}x{_size}", number=max(1, 20000 // (_size * _size)))
+    def _make_maze(size=_size):
+        return lambda: make_maze(size, size, seed=SEED)
+
+    @benchmark(f"add_loops/{_size}x{_size}", number=max(1, 20000 // (_size * _size)))
+    def _add_loops(size=_size):
+        cells = make_maze(size, size, seed=SEED)
+        return lambda: add_loops(bytearray(cells), size, size, size * size // 50, seed=SEED)
+
+
+@benchmark("player_collide/call", number=20000)
+def _player_collide():
+    world = World(seed=SEED)
+    player = world.player
+    return lambda: player.collide(world, 3, 0)
+
+
+@benchmark("enemy_collide/call", number=20000)
+def _enemy_collide():
+    world = World(seed=SEED)
+    world.reset_maze(1)
+    enemy = world.enemies[0]
+    return lambda: enemy.collide(world, 0, -3)
+
+
+for _count in (1, 50, 200):
+    @benchmark(f"reset_maze/{_count}_enemies", number=max(1, 200 // _count))
+    def _reset_maze(count=_count):
+        world = World(seed=SEED)
+        return lambda: world.reset_maze(count, seed=SEED)
+
+
+for _size in (9, 201):
+    @benchmark(f"get_reachable_tiles/{_size}x{_size}", number=max(1, 20000 // (_size * _size)))
+    def _reachable(size=_size):
+        maze = Grid(size, size, make_maze(size, size, seed=SEED))
+        return lambda: get_reachable_tiles(maze, (1, 1))
+
+
+@benchmark("world_step/5_enemies", number=2000)
+def _world_step():
+    from engine.world import Inputs
+    world = World(seed=SEED)
+    world.reset_maze(5, seed=SEED)
+    inputs = Inputs(right=True)
+    return lambda: world.step(inputs)
+
+
+@benchmark("drone_query/500_drones", number=5000)
+def _drone_query():
+    world = World(seed=SEED, expedition=True)
+    world.reset_maze(500, seed=SEED)
+    rect = world.player.rect.inflate(TILE, TILE)
+    return lambda: world.drones.overlapping(rect)
+
+
+def _play_scene(expedition=False):
+    """A World and PlayScene set up like main.py, drawing to an off-screen surface."""
+    pygame.display.set_mode((WIDTH, HEIGHT))
+    images = {}
+    for key, path in (("player", "media/player.png"), ("enemy", "media/drone.png"),
+                      ("speed_boost", "media/lightning2.png"), ("enemy_slow", "media/snowflake3.png")):
+        images[key] = pygame.transform.scale(pygame.image.load(path).convert_alpha(), (TILE, TILE))
+    world = World(seed=SEED, images=images, expedition=expedition)
+    surface = pygame.Surface((WIDTH, HEIGHT))
+    colors = (37, 10, 54), (19, 235, 221), (138, 43, 226), (255, 0, 255)
+    if expedition:
+        camera = Camera((0, INFO_BAR_HEIGHT, WIDTH, HEIGHT - INFO_BAR_HEIGHT), (world.cols * TILE, world.rows * TILE))
+        layer = ChunkedMazeLayer(TILE, (WIDTH, HEIGHT), camera, *colors)
+    else:
+        world.reset_maze(5, seed=SEED)
+        camera = None
+        layer = MazeLayer(TILE, (WIDTH, HEIGHT), (0, INFO_BAR_HEIGHT), *colors)
+    font = pygame.font.Font("media/PressStart2P-Regular.ttf", 18)
+    scene = PlayScene(surface, layer, TextCache(), font, (253, 245, 0), (37, 10, 54), camera)
+    return world, scene
+
+
+@benchmark("render_frame/full", number=300)
+def _render_full():
+    world, scene = _play_scene()
+    return lambda: scene.draw(world, 0.5, 0.5)
+
+
+@benchmark("render_frame/dirty", number=300)
+def _render_dirty():
+    from engine.world import Inputs
+    world, scene = _play_scene()
+    inputs = Inputs(right=True)
+
+    def frame():
+        world.step(inputs)
+        scene.draw_dirty(world, 0.5, 0.5)
+    return frame
+
+
+@benchmark("render_frame/expedition", number=300)
+def _render_expedition():
+    from engine.world import Inputs
+    world, scene = _play_scene(expedition=True)
+    player, inputs = world.player, Inputs()
+    # Sweep the player across the middle of the maze so the view scrolls
+    # (and the whole viewport is recomposed) every frame
+    y = world.rows // 2 * TILE + INFO_BAR_HEIGHT
+    xs = itertools.cycle(range(WIDTH, (world.cols - 2) * TILE - WIDTH, 7))
+
+    def frame():
+        world.step(inputs)
+        player.rect.topleft = player.prev_topleft = (next(xs), y)
+        scene.draw_dirty(world, 0.5, 0.5)
+    return frame
+
+
+for _screen, _integer in (((WIDTH, HEIGHT), False), ((1920, 1080), False), ((2560, 1440), True)):
+    @benchmark(f"present/{_screen[0]}x{_screen[1]}{'_integer' if _integer else ''}", number=100)
+    def _present(screen_size=_screen, integer=_integer):
+        # Full-frame present of the play scene into a window or fullscreen
+        # display of this size
+        world, scene = _play_scene()
+        scene.draw(world, 0.5, 0.5)
+        presenter = Presenter((WIDTH, HEIGHT), (0, 0, 0), integer)
+        presenter.resize(pygame.display.set_mode(screen_size))
+        return lambda: presenter.present(scene.surface)
+
+
+@benchmark("startup/menu", number=1)
+def _startup():
+    # Launch the game until the menu is up and the first level is ready
+    # (main.py --measure-startup), interpreter start-up and exit included
+    command = [sys.executable, "main.py", "--measure-startup"]
+    return lambda: subprocess.run(command, check=True, capture_output=True)
+
+
+def run(selected=None, repeat=5):
+    results = {}
+    for name, number, setup in BENCHMARKS:
+        if selected and not any(part in name for part in selected):
+            continue
+        fn = setup()
+        fn()  # warm up caches
+        samples = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            for _ in range(number):
+                fn()
+            samples.append((time.perf_counter() - start) / number)
+        results[name] = {
+            "median_s": statistics.median(samples),
+            "min_s": min(samples),
+            "calls": number * repeat,
+        }
+        print(f"{name:32s} {_format(results[name]['median_s']):>10s}", flush=True)
+    return results
+
+
+def compare(results, baseline, threshold):
+    """Print the change against baseline; returns the names that regressed."""
+    regressions = []
+    print(f"\n{'benchmark':32s} {'baseline':>10s} {'current':>10s} {'change':>8s}")
+    for name, current in results.items():
+        old = baseline.get("results", {}).get(name)
+        if old is None:
+            print(f"{name:32s} {'-':>10s} {_format(current['median_s']):>10s} {'new':>8s}")
+            continue
+        ratio = current["median_s"] / old["median_s"]
+        flag = ""
+        if ratio > 1 + threshold:
+            flag = "  REGRESSION"
+            regressions.append(name)
+        print(f"{name:32s} {_format(old['median_s']):>10s} {_format(current['median_s']):>10s} "
+              f"{(ratio - 1) * 100:+7.1f}%{flag}")
+    return regressions
+
+
+def _format(seconds):
+    if seconds >= 1e-3:
+        return f"{seconds * 1e3:.2f}ms"
+    return f"{seconds * 1e6:.1f}us"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("names", nargs="*", help="only run benchmarks whose name contains one of these")
+    parser.add_argument("--out", help="write results to this JSON file")
+    parser.add_argument("--compare", metavar="BASELINE", help="compare against a JSON file from --out")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="slowdown ratio counted as a regression (default 0.2 = 20%%)")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    pygame.init()
+    results = run(args.names, args.repeat)
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump({
+                "meta": {
+                    "python": platform.python_version(),
+                    "pygame": pygame.version.ver,
+                    "numpy": np.__version__,
+                    "machine": platform.machine(),
+                    "seed": SEED,
+                },
+                "results": results,
+            }, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if compare(results, baseline, args.threshold):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
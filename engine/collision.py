@@ -0,0 +1,87 @@
+from engine.grid import WALL
+
+
+class TileCollider:
+    """Solid-tile lookup for a maze, built once per generated level.
+
+    Instead of testing a rect against every wall in the maze, only the
+    (usually 1-4) tiles the rect overlaps are looked up in a flat bitmap.
+    Tiles outside the grid are treated as empty, same as the old loop.
+    """
+
+    def __init__(self, maze, tile_size, offset_y=0):
+        self.rows, self.cols = maze.rows, maze.cols
+        self.tile = tile_size
+        self.offset_y = offset_y
+        self.solid = maze.mask((WALL,))
+
+    def hits(self, rect):
+        """Return True if rect overlaps any wall tile."""
+        if rect.width <= 0 or rect.height <= 0:
+            return False
+        tile = self.tile
+        c0 = max(rect.left // tile, 0)
+        c1 = min((rect.right - 1) // tile, self.cols - 1)
+        r0 = max((rect.top - self.offset_y) // tile, 0)
+        r1 = min((rect.bottom - 1 - self.offset_y) // tile, self.rows - 1)
+        solid = self.solid
+        for r in range(r0, r1 + 1):
+            base = r * self.cols
+            for c in range(c0, c1 + 1):
+                if solid[base + c]:
+                    return True
+        return False
+
+    def sweep(self, rect, dx, dy):
+        """Return the signed distance rect can travel along one axis.
+
+        Exactly one of dx/dy is expected to be non-zero. The result is the
+        same as stepping one pixel at a time and stopping at the first step
+        that would overlap a wall, but only the tiles entered along the way
+        are inspected, so the cost no longer depends on the distance.
+        """
+        if dx:
+            dist, step = abs(dx), (1 if dx > 0 else -1)
+            if rect.width <= 0 or rect.height <= 0:
+                return dx
+            if self.hits(rect.move(step, 0)):
+                return 0
+            rows = self._span(rect.top - self.offset_y, rect.bottom - self.offset_y, self.rows)
+            return step * self._advance(rect.left, rect.right, step, dist, self.cols,
+                                        lambda c: self._solid_column(c, rows))
+        if dy:
+            dist, step = abs(dy), (1 if dy > 0 else -1)
+            if rect.width <= 0 or rect.height <= 0:
+                return dy
+            if self.hits(rect.move(0, step)):
+                return 0
+            cols = self._span(rect.left, rect.right, self.cols)
+            return step * self._advance(rect.top - self.offset_y, rect.bottom - self.offset_y,
+                                        step, dist, self.rows,
+                                        lambda r: self._solid_row(r, cols))
+        return 0
+
+    def _span(self, lo, hi, limit):
+        """Tile indices covered by the pixel range [lo, hi), clipped to the grid."""
+        return range(max(lo // self.tile, 0), min((hi - 1) // self.tile, limit - 1) + 1)
+
+    def _solid_column(self, c, rows):
+        return any(self.solid[r * self.cols + c] for r in rows)
+
+    def _solid_row(self, r, cols):
+        base = r * self.cols
+        return any(self.solid[base + c] for c in cols)
+
+    def _advance(self, lo, hi, step, dist, limit, solid):
+        """Distance the pixel range [lo, hi) can move before its leading edge
+        enters a solid tile. The first step is already known to be free."""
+        tile = self.tile
+        if step > 0:
+            for i in range(hi // tile + 1, (hi - 1 + dist) // tile + 1):
+                if 0 <= i < limit and solid(i):
+                    return i * tile - hi
+        else:
+            for i in range((lo - 1) // tile - 1, (lo - dist) // tile - 1, -1):
+                if 0 <= i < limit and solid(i):
+                    return lo - (i + 1) * tile
+        return dist
@@ -0,0 +1,247 @@
+import numpy as np
+import pygame
+from engine.effects import Modifiers
+from engine.spatial import SpatialHash
+
+# Unit directions, indexed by the values stored in DroneSwarm.heading
+DIRECTIONS = [(1, 0), (-1, 0), (0, 1), (0, -1)]
+_DX = np.array([d[0] for d in DIRECTIONS])
+_DY = np.array([d[1] for d in DIRECTIONS])
+_PAD = 2  # empty tiles around the grid, so edge lookups need no bounds checks
+# Swarms up to this size are stepped one drone at a time: for a handful of
+# drones NumPy's per-call overhead costs more than the work itself
+_SCALAR_MAX = 16
+_NONE = np.zeros(0, dtype=np.int64)
+
+
+class DroneSwarm:
+    """Positions, headings and speeds of all drones, stored as NumPy arrays.
+
+    step() advances every drone at once: each one travels up to its speed
+    along its heading, stopping at the play-area bounds or the first wall
+    tile, exactly like a single drone sweeping against the TileCollider.
+    Drones that could not move pick a new random heading.
+
+    Drones are assumed to be at most one tile in size, so a drone's side
+    spans at most two tiles.
+    """
+
+    def __init__(self, positions, headings, speed, size, seed=None):
+        self.x = np.array([p[0] for p in positions], dtype=np.int64)
+        self.y = np.array([p[1] for p in positions], dtype=np.int64)
+        self.heading = np.array(headings, dtype=np.int64)
+        self.base_speed = np.full(len(positions), int(speed), dtype=np.int64)
+        self.speed = self.base_speed.copy()  # with power-up modifiers applied
+        self.modifiers = Modifiers(self.refresh_speed)
+        # Positions before the last step, for render interpolation
+        self.prev_x, self.prev_y = self.x, self.y
+        self.size = size
+        # Drones bucketed by tile, kept up to date as they cross tiles
+        self.cells = SpatialHash(size)
+        for i, (x, y) in enumerate(positions):
+            self.cells.insert(i, int(x), int(y))
+        self.rng = np.random.default_rng(seed)
+        self.grid = None
+        self.collider = None
+
+    def __len__(self):
+        return len(self.x)
+
+    def refresh_speed(self, modifiers=None):
+        """Recompute the effective speeds from base_speed and the modifiers."""
+        speed = np.empty_like(self.base_speed)
+        speed[:] = self.modifiers.apply("speed", self.base_speed)
+        self.speed = speed
+
+    def bind(self, collider):
+        """Use collider's wall bitmap for the following steps."""
+        solid = np.frombuffer(bytes(collider.solid), dtype=np.uint8)
+        solid = solid.reshape(collider.rows, collider.cols).astype(bool)
+        self.grid = np.pad(solid, _PAD)
+        self.collider = collider
+        self.tile = collider.tile
+        self.offset_y = collider.offset_y
+
+    def step(self, max_x, max_y, flow=None):
+        """Move every drone one tick. Drones stay within [0, max_x] x [0, max_y].
+
+        With a FlowField, drones sitting exactly on a tile turn towards its
+        target and never travel past the next tile edge in one tick, so they
+        get a chance to turn at every tile.
+        """
+        if len(self.x) <= _SCALAR_MAX:
+            self._step_scalar(max_x, max_y, flow)
+            return
+        if flow is not None:
+            self._steer(flow)
+        x, y, speed = self.x, self.y, self.speed
+        self.prev_x, self.prev_y = x, y
+        dx, dy = _DX[self.heading], _DY[self.heading]
+        horizontal = dx != 0
+
+        # Travel limit from the bounds, same as stepping one pixel at a time
+        # and stopping at the first step that leaves them
+        pos = np.where(horizontal, x, y)
+        step = np.where(horizontal, dx, dy)
+        high = np.where(horizontal, max_x, max_y)
+        perp_ok = np.where(horizontal, (y >= 0) & (y <= max_y), (x >= 0) & (x <= max_x))
+        nxt = pos + step
+        inside = perp_ok & (nxt >= 0) & (nxt <= high)
+        limit = np.where(inside, np.minimum(speed, np.where(step > 0, high - pos, pos)), 0)
+        limit = np.maximum(limit, 0)
+        if flow is not None:
+            offset = np.where(horizontal, x, y - self.offset_y) % self.tile
+            to_edge = np.where(step > 0, self.tile - offset, np.where(offset == 0, self.tile, offset))
+            limit = np.minimum(limit, to_edge)
+
+        free = np.zeros_like(limit)
+        for mask, grid, axis, perp in (
+                (horizontal, self.grid, x, y - self.offset_y),
+                (~horizontal, self.grid.T, y - self.offset_y, x)):
+            mask = mask & (limit > 0)
+            if mask.any():
+                free[mask] = self._sweep(grid, axis[mask], perp[mask], step[mask], limit[mask])
+
+        self.x = x + np.where(horizontal, step * free, 0)
+        self.y = y + np.where(horizontal, 0, step * free)
+        cell = self.cells.cell
+        crossed = np.flatnonzero((self.x // cell != x // cell) | (self.y // cell != y // cell))
+        for i, nx, ny in zip(crossed.tolist(), self.x[crossed].tolist(), self.y[crossed].tolist()):
+            self.cells.move(i, nx, ny)
+
+        # If a drone couldn't move, pick a new direction
+        stuck = free == 0
+        if stuck.any():
+            self.heading[stuck] = self.rng.integers(0, len(DIRECTIONS), int(stuck.sum()))
+
+    def place(self, x, y):
+        """Move the drones straight to x, y (e.g. positions from a server
+        snapshot) instead of stepping them; the old ones become prev_x/y."""
+        cell = self.cells.cell
+        crossed = np.flatnonzero((x // cell != self.x // cell) | (y // cell != self.y // cell))
+        self.prev_x, self.prev_y = self.x, self.y
+        self.x, self.y = x, y
+        for i, nx, ny in zip(crossed.tolist(), x[crossed].tolist(), y[crossed].tolist()):
+            self.cells.move(i, nx, ny)
+
+    def _step_scalar(self, max_x, max_y, flow):
+        """step() for small swarms: the same rules with plain ints, using
+        the TileCollider's own sweep for walls."""
+        tile, offset_y = self.tile, self.offset_y
+        sweep = self.collider.sweep
+        rect = pygame.Rect(0, 0, self.size, self.size)
+        xs, ys, headings = self.x.tolist(), self.y.tolist(), self.heading.tolist()
+        stuck = []
+        for i, speed in enumerate(self.speed.tolist()):
+            x, y = xs[i], ys[i]
+            if flow is not None and x % tile == 0 and (y - offset_y) % tile == 0:
+                r, c = (y - offset_y) // tile, x // tile
+                rows, cols = flow.heading.shape
+                if 0 <= r < rows and 0 <= c < cols and flow.heading[r, c] >= 0:
+                    headings[i] = int(flow.heading[r, c])
+            dx, dy = DIRECTIONS[headings[i]]
+            if dx:
+                pos, step, high, perp_ok = x, dx, max_x, 0 <= y <= max_y
+            else:
+                pos, step, high, perp_ok = y, dy, max_y, 0 <= x <= max_x
+            limit = 0
+            if perp_ok and 0 <= pos + step <= high:
+                limit = max(min(speed, high - pos if step > 0 else pos), 0)
+            if flow is not None:
+                offset = (x if dx else y - offset_y) % tile
+                limit = min(limit, tile - offset if step > 0 else offset or tile)
+            free = 0
+            if limit > 0:
+                rect.topleft = x, y
+                free = abs(sweep(rect, dx * limit, dy * limit))
+            if free:
+                xs[i], ys[i] = x + dx * free, y + dy * free
+                self.cells.move(i, xs[i], ys[i])
+            else:
+                stuck.append(i)
+
+        self.prev_x, self.prev_y = self.x, self.y
+        self.x = np.array(xs, dtype=np.int64)
+        self.y = np.array(ys, dtype=np.int64)
+        self.heading = np.array(headings, dtype=np.int64)
+        # If a drone couldn't move, pick a new direction
+        if stuck:
+            self.heading[stuck] = self.rng.integers(0, len(DIRECTIONS), len(stuck))
+
+    def _steer(self, flow):
+        """Turn drones that sit exactly on a tile along the flow field."""
+        tile = self.tile
+        local_y = self.y - self.offset_y
+        rows, cols = flow.heading.shape
+        r, c = local_y // tile, self.x // tile
+        aligned = ((self.x % tile == 0) & (local_y % tile == 0) &
+                   (r >= 0) & (r < rows) & (c >= 0) & (c < cols))
+        if aligned.any():
+            heading = flow.heading[r[aligned], c[aligned]]
+            turn = np.flatnonzero(aligned)[heading >= 0]
+            self.heading[turn] = heading[heading >= 0]
+
+    def _sweep(self, grid, pos, perp, step, dist):
+        """Vectorised TileCollider.sweep for drones moving along one axis.
+
+        grid is the padded wall bitmap indexed [perpendicular tile, axis tile];
+        pos/perp are pixel coordinates along and across the axis. Returns how
+        far each drone can travel, at most dist.
+        """
+        tile, size = self.tile, self.size
+        last_perp, last_axis = grid.shape[0] - 1, grid.shape[1] - 1
+        p0 = np.minimum(np.maximum(perp // tile + _PAD, 0), last_perp)
+        p1 = np.minimum(np.maximum((perp + size - 1) // tile + _PAD, 0), last_perp)
+
+        # (np.minimum/np.maximum: np.clip's Python-level dispatch costs more
+        # than the clipping itself at these array sizes)
+        def solid(a):
+            a = np.minimum(np.maximum(a + _PAD, 0), last_axis)
+            return grid[p0, a] | grid[p1, a]
+
+        # A drone already touching a wall one pixel ahead can't move at all
+        blocked = solid((pos + step) // tile) | solid((pos + step + size - 1) // tile)
+
+        # Otherwise scan the tiles its leading edge enters, nearest first
+        forward = step > 0
+        lead = pos + size
+        start = np.where(forward, lead // tile + 1, (pos - 1) // tile - 1)
+        end = np.where(forward, (lead - 1 + dist) // tile, (pos - dist) // tile)
+        count = step * (end - start) + 1
+        free = dist.copy()
+        scanning = ~blocked
+        for k in range(int(count.max(initial=0))):
+            a = start + step * k
+            hit = scanning & (k < count) & solid(a)
+            if hit.any():
+                free = np.where(hit, np.where(forward, a * tile - lead, pos - (a + 1) * tile), free)
+                scanning &= ~hit
+        free[blocked] = 0
+        return free
+
+    def overlapping(self, rect):
+        """Indices of drones whose rect overlaps rect, in ascending order.
+
+        Only the drones the spatial hash files near rect are tested.
+        """
+        candidates = self.cells.candidates(rect)
+        if not candidates:
+            return _NONE
+        candidates.sort()
+        size = self.size
+        if len(candidates) <= _SCALAR_MAX:
+            x, y = self.x, self.y
+            left, top, right, bottom = rect.left - size, rect.top - size, rect.right, rect.bottom
+            return np.array([i for i in candidates if left < x[i] < right and top < y[i] < bottom],
+                            dtype=np.int64)
+        index = np.array(candidates, dtype=np.int64)
+        x, y = self.x[index], self.y[index]
+        hit = ((x < rect.right) & (rect.left < x + size) &
+               (y < rect.bottom) & (rect.top < y + size))
+        return index[hit]
+
+    def neighbors(self, i):
+        """Indices of the other drones overlapping drone i."""
+        rect = pygame.Rect(int(self.x[i]), int(self.y[i]), self.size, self.size)
+        index = self.overlapping(rect)
+        return index[index != i]
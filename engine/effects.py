@@ -0,0 +1,110 @@
+import heapq
+import itertools
+
+
+class Modifiers:
+    """Temporary stat changes on one entity, layered over its base stats.
+
+    Effects add a modifier and later remove it by the token add() returned,
+    so overlapping effects stack and end independently and the base value
+    is never overwritten. A modifier either pins a stat to a value or
+    scales it; pins apply first (the latest wins), then every scale.
+    on_change(modifiers) is called whenever the set changes so the entity
+    can refresh its effective stats.
+    """
+
+    def __init__(self, on_change=None):
+        self.on_change = on_change
+        self._active = {}  # token -> (stat, set_to, scale)
+        self._tokens = itertools.count()
+
+    def __len__(self):
+        return len(self._active)
+
+    def add(self, stat, set_to=None, scale=None):
+        token = next(self._tokens)
+        self._active[token] = (stat, set_to, scale)
+        if self.on_change:
+            self.on_change(self)
+        return token
+
+    def remove(self, token):
+        if self._active.pop(token, None) is not None and self.on_change:
+            self.on_change(self)
+
+    def clear(self):
+        if self._active:
+            self._active.clear()
+            if self.on_change:
+                self.on_change(self)
+
+    def apply(self, stat, base):
+        """Effective value of stat given its base value."""
+        value = base
+        for name, set_to, _ in self._active.values():
+            if name == stat and set_to is not None:
+                value = set_to
+        for name, _, scale in self._active.values():
+            if name == stat and scale is not None:
+                value = value * scale
+        return value
+
+
+class Timer:
+    """A scheduled expiry; pass it to EffectScheduler.cancel() to drop it."""
+    __slots__ = ("expires_at", "callback", "cancelled")
+
+    def __init__(self, expires_at, callback):
+        self.expires_at = expires_at
+        self.callback = callback
+        self.cancelled = False
+
+
+class EffectScheduler:
+    """Calls effect expiry callbacks once their duration of game time is up.
+
+    Pending expiries sit in a heap ordered by time, so a tick with nothing
+    due costs one comparison and each expiry O(log n), however many
+    effects are running. Time only moves in advance(), i.e. with the
+    simulation.
+    """
+
+    def __init__(self):
+        self.now = 0.0
+        self._heap = []  # (expires_at, seq, Timer)
+        self._seq = itertools.count()
+
+    def __len__(self):
+        return sum(1 for _, _, timer in self._heap if not timer.cancelled)
+
+    def schedule(self, duration, callback):
+        """Call callback() duration seconds of game time from now."""
+        timer = Timer(self.now + duration, callback)
+        heapq.heappush(self._heap, (timer.expires_at, next(self._seq), timer))
+        return timer
+
+    def cancel(self, timer):
+        timer.cancelled = True  # skipped when it comes up
+
+    def remaining(self, timer):
+        return max(timer.expires_at - self.now, 0.0)
+
+    def advance(self, dt):
+        """Move time forward by dt and fire everything that expired, in order."""
+        self.now += dt
+        heap = self._heap
+        # now is a running sum of ticks, so allow for its rounding error or
+        # an effect lasting a whole number of ticks can run one tick over
+        due = self.now + 1e-9
+        while heap and heap[0][0] <= due:
+            timer = heapq.heappop(heap)[2]
+            if not timer.cancelled:
+                timer.callback()
+
+    def clear(self):
+        """End every pending effect now (firing its callback) and start over."""
+        heap, self._heap = self._heap, []
+        while heap:
+            timer = heapq.heappop(heap)[2]
+            if not timer.cancelled:
+                timer.callback()
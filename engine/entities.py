@@ -0,0 +1,130 @@
+import pygame
+from engine.settings import TILE, INFO_BAR_HEIGHT
+from engine.drones import DIRECTIONS
+from engine.effects import Modifiers
+
+
+class Player:
+    def __init__(self, x, y, image=None):
+        self.rect = pygame.Rect(x, y + INFO_BAR_HEIGHT, TILE - 5, TILE - 5)
+        self.base_speed = 4
+        self.speed = self.base_speed  # base_speed with power-up modifiers applied
+        self.modifiers = Modifiers(self._refresh_stats)
+        self.color = (253, 245, 0)
+        self.image = image
+        self.glitch_used = False
+        self.last_valid_position = (x, y)
+        self.prev_topleft = self.rect.topleft  # position before the last tick
+        self.active = True  # False for a co-op spy whose slot nobody is playing
+
+    def _refresh_stats(self, modifiers):
+        self.speed = int(modifiers.apply("speed", self.base_speed))
+
+    def move(self, world, dx, dy):
+        moved = False
+        # Resolve the whole move against the tile grid in one sweep
+        # (distance varies with powerups like speed boost)
+        if dx != 0:
+            free = world.collider.sweep(self.rect, dx, 0)
+            if free:
+                self.rect.x += free
+                moved = True
+            if free != dx and world.glitch_mode and not self.glitch_used:
+                # Glitch through one tile horizontally
+                step = 1 if dx > 0 else -1
+                self.last_valid_position = (self.rect.x, self.rect.y)
+                self.rect.x += step * 2 * TILE
+                self.glitch_used = True
+                moved = True
+
+        if dy != 0:
+            free = world.collider.sweep(self.rect, 0, dy)
+            if free:
+                self.rect.y += free
+                moved = True
+            if free != dy and world.glitch_mode and not self.glitch_used:
+                # Glitch through one tile vertically
+                step = 1 if dy > 0 else -1
+                self.last_valid_position = (self.rect.x, self.rect.y)
+                self.rect.y += step * 2 * TILE
+                self.glitch_used = True
+                moved = True
+
+        # correct invalid movement
+        if self.glitch_used:
+            self.move_to_nearest_empty_space(world)
+
+        return moved
+
+    def collide(self, world, dx, dy):
+        return world.collider.hits(self.rect.move(dx, dy))
+
+    def move_to_nearest_empty_space(self, world):
+        """Snap player back to last valid position if inside a wall tile."""
+        maze = world.maze
+        # Get all corners of the player's rect
+        corners = [
+            (self.rect.left,  self.rect.top),
+            (self.rect.right - 1, self.rect.top),
+            (self.rect.left,  self.rect.bottom - 1),
+            (self.rect.right - 1, self.rect.bottom - 1),
+        ]
+
+        stuck = False
+        for (px, py) in corners:
+            row = (py - INFO_BAR_HEIGHT) // TILE
+            col = px // TILE
+            if not (0 <= row < maze.rows and 0 <= col < maze.cols) or maze[row][col] == 1:
+                stuck = True
+                break
+
+        if stuck and hasattr(self, "last_valid_position"):
+            self.rect.x, self.rect.y = self.last_valid_position
+
+    def draw(self, surface, alpha=1.0, offset=(0, 0)):
+        """Blit the player alpha of the way from its previous tick position,
+        shifted by -offset (the camera scroll)."""
+        x, y = lerp(self.prev_topleft, self.rect.topleft, alpha)
+        return surface.blit(self.image, (x - offset[0], y - offset[1]))
+
+
+def lerp(start, end, alpha):
+    """Point alpha (0-1) of the way from start to end, rounded to pixels."""
+    return (round(start[0] + (end[0] - start[0]) * alpha),
+            round(start[1] + (end[1] - start[1]) * alpha))
+
+
+class Enemy:
+    """One drone of a DroneSwarm.
+
+    The swarm owns position, heading and speed and moves all drones at
+    once; this is a thin view onto one of them for collision checks,
+    power-ups and drawing.
+    """
+
+    def __init__(self, swarm, index, image=None):
+        self.swarm = swarm
+        self.index = index
+        self.image = image
+
+    @property
+    def rect(self):
+        size = self.swarm.size
+        return pygame.Rect(int(self.swarm.x[self.index]), int(self.swarm.y[self.index]), size, size)
+
+    @property
+    def speed(self):
+        return int(self.swarm.speed[self.index])
+
+    @property
+    def direction(self):
+        return DIRECTIONS[self.swarm.heading[self.index]]
+
+    def collide(self, world, dx, dy):
+        return world.collider.hits(self.rect.move(dx, dy))
+
+    def draw(self, surface, alpha=1.0, offset=(0, 0)):
+        i = self.index
+        start = (int(self.swarm.prev_x[i]), int(self.swarm.prev_y[i]))
+        x, y = lerp(start, self.rect.topleft, alpha)
+        return surface.blit(self.image, (x - offset[0], y - offset[1]))
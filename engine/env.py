@@ -0,0 +1,127 @@
+"""Gym-style environment for training bots on the game, no window needed.
+
+    env = GlitchScapeEnv()
+    obs = env.reset(seed=1)
+    obs, reward, terminated, truncated, info = env.step(action)
+
+An action is a bitmask of held buttons, bit i being Inputs._fields[i]
+(left, right, up, down, glitch), so there are ACTIONS = 32 of them. An
+observation is a dict of two arrays:
+
+    grid   uint8 (rows, cols)  tile values (0 free, 1 wall, 9 goal)
+    state  float32 (STATE_SIZE + 3 * max_drones,)
+           the STATE_FIELDS below, then x, y, present for each drone slot
+
+There are DRONE_SLOTS_PER_SCREEN slots per screen of maze unless
+max_drones says otherwise; that covers every drone up to level 45 or so.
+Drones beyond the last slot are left out of the observation, and
+info["hidden_drones"] counts them.
+
+Positions are in tiles from the maze's top-left corner (the player's and
+the drones' top-left corners, fractional while moving). Reaching the goal
+gives +1 and the game carries on with the next level; being caught gives
+-1 and ends the episode, as does running out of max_steps.
+"""
+import random
+
+import numpy as np
+
+from engine.settings import TILE, INFO_BAR_HEIGHT, TICK
+from engine.world import World, INPUTS, maze_size
+
+ACTIONS = len(INPUTS)
+STATE_FIELDS = (
+    "player_x", "player_y", "player_speed",     # speed relative to normal
+    "goal_x", "goal_y",
+    "glitch_active", "glitch_cooldown",         # cooldown: fraction still to wait
+    "boost_x", "boost_y", "boost_on_board",
+    "slow_x", "slow_y", "slow_on_board",
+)
+STATE_SIZE = len(STATE_FIELDS)
+DRONE_FIELDS = ("x", "y", "present")
+DRONE_SLOTS_PER_SCREEN = 16
+
+
+class GlitchScapeEnv:
+    """One game, stepped one tick per action.
+
+    With buffers=(grid, state) observations are written straight into
+    those arrays (e.g. views of shared memory) and returned without
+    copying; otherwise each call returns fresh arrays.
+    """
+
+    def __init__(self, max_drones=None, max_steps=120 * 30, hunter=False, expedition=False, buffers=None):
+        self.rows, self.cols = maze_size(expedition)
+        if max_drones is None:
+            screen_rows, screen_cols = maze_size()
+            max_drones = DRONE_SLOTS_PER_SCREEN * max(1, self.rows * self.cols // (screen_rows * screen_cols))
+        self.max_drones = max_drones
+        self.max_steps = max_steps
+        self.world_options = dict(hunter=hunter, expedition=expedition)
+        self.seeds = random.Random()
+        self.world = None  # until reset()
+        self.steps = 0
+        shapes = self.observation_shapes(self.rows, self.cols, max_drones)
+        if buffers is None:
+            self.grid = np.zeros(shapes["grid"], dtype=np.uint8)
+            self.state = np.zeros(shapes["state"], dtype=np.float32)
+            self.copy = True
+        else:
+            self.grid, self.state = buffers
+            self.copy = False
+
+    @staticmethod
+    def observation_shapes(rows, cols, max_drones):
+        return {"grid": (rows, cols), "state": (STATE_SIZE + len(DRONE_FIELDS) * max_drones,)}
+
+    def reset(self, seed=None):
+        """Start a new game. A seed reseeds the sequence of games that follow."""
+        if seed is not None:
+            self.seeds.seed(seed)
+        if self.world is not None:
+            self.world.close()
+        self.world = World(seed=self.seeds.getrandbits(64), **self.world_options)
+        self.steps = 0
+        return self.observe()
+
+    def step(self, action):
+        world = self.world
+        outcome = world.step(INPUTS[action], TICK)
+        self.steps += 1
+        reward = 1.0 if outcome == "goal" else -1.0 if outcome == "lose" else 0.0
+        terminated = outcome == "lose"
+        truncated = not terminated and self.steps >= self.max_steps
+        info = {"level": world.level, "score": world.score,
+                "hidden_drones": max(len(world.drones) - self.max_drones, 0)}
+        return self.observe(), reward, terminated, truncated, info
+
+    def observe(self):
+        """Write the current observation into the buffers and return it."""
+        world, state = self.world, self.state
+        maze = world.maze
+        self.grid[...] = np.frombuffer(maze.cells, dtype=np.uint8).reshape(maze.rows, maze.cols)
+
+        player = world.player
+        boost, slow = world.powerups
+        state[:STATE_SIZE] = (
+            player.rect.x / TILE, (player.rect.y - INFO_BAR_HEIGHT) / TILE, player.speed / player.base_speed,
+            world.goal_col, world.goal_row,
+            world.glitch_mode, max(world.cooldown_timer, 0) / world.glitch_cooldown,
+            boost.rect.x / TILE, (boost.rect.y - INFO_BAR_HEIGHT) / TILE, boost in world.pickup_cells,
+            slow.rect.x / TILE, (slow.rect.y - INFO_BAR_HEIGHT) / TILE, slow in world.pickup_cells,
+        )
+
+        drones = state[STATE_SIZE:].reshape(self.max_drones, len(DRONE_FIELDS))
+        n = min(len(world.drones), self.max_drones)
+        drones[:n, 0] = world.drones.x[:n] / TILE
+        drones[:n, 1] = (world.drones.y[:n] - INFO_BAR_HEIGHT) / TILE
+        drones[:n, 2] = 1
+        drones[n:] = 0
+
+        if self.copy:
+            return {"grid": self.grid.copy(), "state": state.copy()}
+        return {"grid": self.grid, "state": state}
+
+    def close(self):
+        if self.world is not None:
+            self.world.close()
@@ -0,0 +1,78 @@
+import functools
+
+import numpy as np
+
+# Tile values
+FREE, WALL, GOAL = 0, 1, 9
+
+
+class Grid:
+    """A rows x cols tile map stored in one contiguous bytearray.
+
+    grid[r][c] reads and writes tiles like the old list of rows did: each
+    row is a memoryview into self.cells, so there is no per-row object
+    overhead and whole-grid work (masks, searches, borders) runs over a
+    single buffer.
+    """
+
+    def __init__(self, rows, cols, cells=None):
+        if cells is None:
+            cells = bytearray(rows * cols)
+        elif len(cells) != rows * cols:
+            raise ValueError(f"expected {rows * cols} cells for a {rows}x{cols} grid, got {len(cells)}")
+        self.rows, self.cols = rows, cols
+        self.cells = cells
+        view = memoryview(cells)
+        self._rows = [view[i:i + cols] for i in range(0, rows * cols, cols)]
+
+    @classmethod
+    def from_rows(cls, rows):
+        """Build a Grid from a list of equal-length rows of tile values."""
+        cols = len(rows[0]) if rows else 0
+        return cls(len(rows), cols, bytearray(value for row in rows for value in row))
+
+    def __len__(self):
+        return self.rows
+
+    def __getitem__(self, r):
+        return self._rows[r]
+
+    def __iter__(self):
+        return iter(self._rows)
+
+    def __eq__(self, other):
+        if not isinstance(other, Grid):
+            return NotImplemented
+        return (self.rows, self.cols, self.cells) == (other.rows, other.cols, other.cells)
+
+    def copy(self):
+        return Grid(self.rows, self.cols, bytearray(self.cells))
+
+    def fill_border(self, value=WALL):
+        """Set every tile on the outer edge to value."""
+        rows, cols, cells = self.rows, self.cols, self.cells
+        if not rows or not cols:
+            return
+        cells[:cols] = cells[(rows - 1) * cols:] = bytes([value]) * cols
+        cells[::cols] = cells[cols - 1::cols] = bytes([value]) * rows
+
+    def mask(self, values):
+        """bytearray with 1 for every tile whose value is in values, else 0."""
+        return self.cells.translate(_mask_table(tuple(values)))
+
+    def find(self, value):
+        """(row, col) of every tile equal to value, in row-major order."""
+        index = np.flatnonzero(np.frombuffer(self.cells, dtype=np.uint8) == value)
+        return list(zip((index // self.cols).tolist(), (index % self.cols).tolist()))
+
+    def free_tiles(self, exclude=()):
+        """(row, col) of every FREE tile not in exclude, in row-major order."""
+        tiles = self.find(FREE)
+        if exclude:
+            tiles = [tile for tile in tiles if tile not in exclude]
+        return tiles
+
+
+@functools.lru_cache(maxsize=None)
+def _mask_table(values):
+    return bytes(1 if value in values else 0 for value in range(256))
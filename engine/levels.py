@@ -0,0 +1,113 @@
+import random
+from concurrent.futures import ThreadPoolExecutor
+from typing import NamedTuple
+
+from engine.settings import TILE, INFO_BAR_HEIGHT
+from engine.collision import TileCollider
+from engine.grid import Grid
+from engine.mazegen import make_maze, add_loops
+from engine.drones import DIRECTIONS
+from engine.pathing import MazeAnalysis
+
+
+class LevelPlan(NamedTuple):
+    """Everything needed to start a level, built without touching a World."""
+    seed: int
+    num_enemies: int
+    maze: Grid
+    collider: TileCollider
+    analysis: MazeAnalysis
+    goal: tuple             # (row, col)
+    spawns: list            # drone top-left corners in screen coords
+    headings: list          # index into DIRECTIONS per drone
+    drone_seed: int
+    speed_boost: tuple      # (row, col)
+    enemy_slow: tuple       # (row, col)
+
+
+def plan_level(rows, cols, num_enemies, seed):
+    """Generate a level from seed alone.
+
+    Pure: the same arguments always give the same plan and no shared state
+    is touched, so this is safe to run on a worker thread while the
+    current level is being played.
+    """
+    rng = random.Random(seed)
+    cells = make_maze(rows, cols, rng=rng)
+    add_loops(cells, rows, cols, extra_paths=10, rng=rng)
+
+    # Enforce borders and keep the player start free
+    maze = Grid(rows, cols, cells)
+    maze.fill_border()
+    maze[1][1] = 0
+
+    # Every placement below works from one analysis of the maze
+    analysis = MazeAnalysis(maze, (1, 1))
+    reachable = analysis.pickup_tiles
+
+    # Place goal
+    if reachable:
+        goal = rng.choice(reachable)
+        maze[goal[0]][goal[1]] = 9
+    else:
+        # Fallback - this should rarely happen
+        goal = (1, 2)
+        if maze[1][2] == 0:
+            maze[1][2] = 9
+
+    # Enemy spawns on any free tile that isn't the player start or goal
+    free_tiles = analysis.spawn_tiles(exclude=(goal,))
+    spawns, headings = [], []
+    for _ in range(num_enemies):
+        if free_tiles:
+            er, ec = rng.choice(free_tiles)
+        else:
+            # Fallback enemy position
+            er, ec = 3, 3
+            maze[er][ec] = 0  # Force it to be walkable
+        spawns.append((ec*TILE, er*TILE + INFO_BAR_HEIGHT))
+        headings.append(rng.randrange(len(DIRECTIONS)))
+
+    # Power-ups go on tiles reachable from the start, but not on the goal
+    pickups = [pos for pos in reachable if pos != goal] or [(1, 2)]
+    speed_boost = rng.choice(pickups)
+    enemy_slow = rng.choice(pickups)
+
+    return LevelPlan(seed, num_enemies, maze, TileCollider(maze, TILE, INFO_BAR_HEIGHT), analysis,
+                     goal, spawns, headings, rng.getrandbits(64), speed_boost, enemy_slow)
+
+
+class LevelPrefetcher:
+    """Builds the next level's plan on a background thread.
+
+    request() starts generating a plan; take() hands it over if it matches
+    what is now needed (waiting for it to finish if necessary), otherwise
+    returns None and the caller generates synchronously. Only the most
+    recent request is kept.
+    """
+
+    def __init__(self):
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="level-prefetch")
+        self.key = None
+        self.future = None
+
+    def request(self, rows, cols, num_enemies, seed):
+        key = (rows, cols, num_enemies, seed)
+        if key != self.key:
+            if self.future is not None:
+                self.future.cancel()
+            self.key = key
+            self.future = self.executor.submit(plan_level, *key)
+
+    def take(self, rows, cols, num_enemies, seed):
+        future, key = self.future, self.key
+        self.future = self.key = None
+        if future is None or key != (rows, cols, num_enemies, seed) or future.cancelled():
+            return None
+        return future.result()
+
+    def close(self):
+        if self.future is not None:
+            self.future.cancel()
+        self.future = self.key = None
+        self.executor.shutdown(wait=False)
@@ -0,0 +1,75 @@
+import itertools
+import random
+
+# Every ordering of the four carving directions, so each cell only needs
+# one random draw instead of a full shuffle.
+_ORDERS = list(itertools.permutations(((0, 2), (0, -2), (2, 0), (-2, 0))))
+
+
+def make_rng(rng=None, seed=None):
+    """Return rng if given, otherwise a new random.Random seeded with seed."""
+    return rng if rng is not None else random.Random(seed)
+
+
+def make_maze(rows, cols, rng=None, seed=None):
+    """Carve a maze with an iterative depth-first backtracker.
+
+    Returns a flat bytearray of rows * cols cells (1 = wall, 0 = floor),
+    indexed as cells[r * cols + c]. The explicit stack means grid size is
+    no longer limited by the recursion limit, and passing rng or seed makes
+    the output reproducible.
+    """
+    rng = make_rng(rng, seed)
+    if rows < 2 or cols < 2:
+        return bytearray(b"\x01") * (rows * cols)
+
+    # Carve in a copy padded by two cells on every side. Padding is 0, so a
+    # single lookup rejects both carved cells and out-of-bounds targets.
+    width = cols + 4
+    padded = bytearray(width * (rows + 4))
+    for r in range(rows):
+        start = (r + 2) * width + 2
+        padded[start:start + cols] = b"\x01" * cols
+    orders = [tuple(dr * width + dc for dr, dc in order) for order in _ORDERS]
+    rand = rng.random
+
+    start = 3 * width + 3  # cell (1, 1)
+    padded[start] = 0
+    # Each frame keeps its own direction iterator, so popping back to a cell
+    # resumes with the directions it had left, just like the recursive version
+    stack = [(start, iter(orders[int(rand() * 24)]))]
+    push, top = stack.append, stack.pop
+    while stack:
+        i, dirs = stack[-1]
+        for d in dirs:
+            n = i + d
+            if padded[n]:
+                padded[i + d // 2] = 0  # remove wall in between
+                padded[n] = 0
+                push((n, iter(orders[int(rand() * 24)])))
+                break
+        else:
+            top()
+
+    cells = bytearray()
+    for r in range(rows):
+        start = (r + 2) * width + 2
+        cells += padded[start:start + cols]
+    return cells
+
+
+def add_loops(cells, rows, cols, extra_paths=8, rng=None, seed=None):
+    """Knock out up to extra_paths walls next to random cells to create loops.
+
+    All cell positions are drawn up front and then applied to the flat
+    buffer in one pass.
+    """
+    rng = make_rng(rng, seed)
+    picks = [rng.randrange(1, rows - 1, 2) * cols + rng.randrange(1, cols - 1, 2)
+             for _ in range(extra_paths)]
+    for i in picks:
+        neighbors = [n for n in (i - cols, i + cols, i - 1, i + 1) if cells[n] == 1]
+        if neighbors:
+            cells[rng.choice(neighbors)] = 0
+    return cells
+
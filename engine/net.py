@@ -0,0 +1,550 @@
+"""Server-authoritative co-op: two (or more) spies in one maze over TCP.
+
+    python -m engine.net serve --port 5055          # headless server
+    python main.py --join localhost:5055            # each spy's window
+    python main.py --host 5055                      # or serve and play in one
+    python -m engine.net bench --drones 10,100,1000 # all over localhost
+
+The server owns the only real World and steps it every TICK with the
+buttons each client last reported; clients send their input mask only
+when it changes, and draw a mirror World rebuilt from what the server
+sends back:
+
+    LEVEL     once per level: the maze (zlib), goal, power-ups, drone count
+    SNAPSHOT  every tick: a small header (level, score, glitch timers in
+              ticks, power-up states, which slots are connected) and the
+              position of every player and drone, delta-coded against
+              where both ends predict it to be: the last position plus
+              the last tick's movement. Positions
+              are whole pixels, as in the simulation; the misses are
+              zigzag-coded and bit-packed at the narrowest width that fits
+              all of them, after a bitmap of which entities missed at all.
+
+Drones travel in straight lines at a steady speed, so almost every one
+lands where predicted and costs a single bit; only the ones that turn or
+stop carry a few bits more. TCP delivers every snapshot in order, so each
+one builds on the last; the first after a LEVEL predicts from all zeros.
+A snapshot is encoded once per tick, with NumPy, and the same bytes go to
+every client.
+"""
+import argparse
+import random
+import select
+import selectors
+import socket
+import struct
+import sys
+import time
+import zlib
+
+import numpy as np
+from engine.settings import TILE, INFO_BAR_HEIGHT, TICK, COOP_PORT, HUNTER, EXPEDITION
+from engine.grid import Grid
+from engine.drones import DroneSwarm
+from engine.entities import Enemy
+from engine.world import World, Inputs, INPUTS, input_mask
+
+MAX_BACKLOG = 1 << 20  # bytes queued for a client before it is dropped as stalled
+
+FRAME = struct.Struct("<BI")  # message type, payload length
+HELLO, LEVEL, SNAPSHOT, INPUT = 1, 2, 3, 4
+WELCOME = struct.Struct("<BBB")              # your slot, players, flags
+LEVEL_HEADER = struct.Struct("<HHhhHH4h")    # rows, cols, goal row/col, drones, drone speed, 2 power-up x/y
+SNAPSHOT_HEADER = struct.Struct("<IHHHHHBBB")  # tick, level, enemy speed, score, final score, flags, glitch,
+                                               # cooldown, which players are in the game (bit per slot)
+MAX_PLAYERS = 8
+SPARSE_HEADER = struct.Struct("<BBH")         # width | SPARSE, gap width, count
+SPARSE = 0x80
+
+# SNAPSHOT flags: glitch on, the tick's outcome, then two bits per power-up
+GLITCH_ON = 1
+OUTCOMES = (None, "goal", "lose")  # stored in bits 1-2
+ON_BOARD, ACTIVE, USED = 0, 1, 2   # power-up states, from bit 3 up
+
+
+def pack_deltas(predicted, current):
+    """Bit-pack (n, 2) int positions as their differences from predicted.
+
+    Layout: one byte holding the bit width w of the differences, then
+    which entities differ at all, then w bits per coordinate of each one
+    that does. "Which" is a bitmap of all n, or when few differ (SPARSE
+    set in the first byte) their count and the gaps between their indices.
+    """
+    delta = current - predicted
+    missed = (delta != 0).any(axis=1)
+    values = delta[missed].ravel()
+    values = (values << 1) ^ (values >> 63)  # zigzag: small magnitudes, small codes
+    width = int(values.max(initial=0)).bit_length()
+    index = np.flatnonzero(missed)
+    gaps = np.diff(index, prepend=-1) - 1
+    gap_width = int(gaps.max(initial=0)).bit_length()
+    if len(index) < 1 << 16 and SPARSE_HEADER.size + (len(index) * gap_width + 7) // 8 < (len(missed) + 7) // 8:
+        which = SPARSE_HEADER.pack(width | SPARSE, gap_width, len(index)) + _pack_bits(gaps, gap_width)
+    else:
+        which = bytes((width,)) + np.packbits(missed).tobytes()
+    return which + _pack_bits(values, width)
+
+
+def unpack_deltas(predicted, data, offset=0):
+    """Inverse of pack_deltas. Returns (positions, offset past the block)."""
+    n = len(predicted)
+    width = data[offset]
+    if width & SPARSE:
+        width, gap_width, count = SPARSE_HEADER.unpack_from(data, offset)
+        width &= ~SPARSE
+        gaps, offset = _unpack_bits(data, offset + SPARSE_HEADER.size, count, gap_width)
+        missed = np.cumsum(gaps + 1) - 1
+        count = len(missed)
+    else:
+        size = (n + 7) // 8
+        missed = np.unpackbits(np.frombuffer(data, np.uint8, size, offset + 1), count=n).astype(bool)
+        count = int(np.count_nonzero(missed))
+        offset += 1 + size
+    values, offset = _unpack_bits(data, offset, 2 * count, width)
+    current = predicted.copy()
+    current[missed] += ((values >> 1) ^ -(values & 1)).reshape(-1, 2)
+    return current, offset
+
+
+def _pack_bits(values, width):
+    """Non-negative ints as width bits each, most significant first."""
+    bits = (values[:, None] >> np.arange(width - 1, -1, -1)) & 1
+    return np.packbits(bits.astype(np.uint8)).tobytes()
+
+
+def _unpack_bits(data, offset, count, width):
+    size = (count * width + 7) // 8
+    bits = np.unpackbits(np.frombuffer(data, np.uint8, size, offset), count=count * width)
+    weights = 1 << np.arange(width - 1, -1, -1, dtype=np.int64)
+    return bits.reshape(count, width).astype(np.int64) @ weights, offset + size
+
+
+def positions(world):
+    """(players + drones, 2) pixel positions of everything that moves."""
+    drones = world.drones
+    out = np.empty((len(world.players) + len(drones), 2), dtype=np.int64)
+    out[:len(world.players)] = [player.rect.topleft for player in world.players]
+    out[len(world.players):, 0] = drones.x
+    out[len(world.players):, 1] = drones.y
+    return out
+
+
+def powerup_state(world, pu):
+    if pu.active:
+        return ACTIVE
+    return ON_BOARD if pu in world.pickup_cells else USED
+
+
+def frame(kind, payload):
+    return FRAME.pack(kind, len(payload)) + payload
+
+
+class _Connection:
+    """One socket with buffered, framed, non-blocking reads and writes."""
+
+    def __init__(self, sock):
+        sock.setblocking(False)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.sock = sock
+        self.inbox = bytearray()
+        self.outbox = bytearray()
+        self.closed = False
+
+    def send(self, data):
+        self.outbox += data
+        self.flush()
+
+    def flush(self):
+        try:
+            while self.outbox:
+                sent = self.sock.send(self.outbox)
+                del self.outbox[:sent]
+        except BlockingIOError:
+            pass
+        except OSError:
+            self.closed = True
+
+    def receive(self):
+        """Read what has arrived and return the complete messages in it."""
+        try:
+            while True:
+                data = self.sock.recv(65536)
+                if not data:
+                    self.closed = True
+                    break
+                self.inbox += data
+        except BlockingIOError:
+            pass
+        except OSError:
+            self.closed = True
+        messages, inbox, offset = [], self.inbox, 0
+        while len(inbox) - offset >= FRAME.size:
+            kind, length = FRAME.unpack_from(inbox, offset)
+            end = offset + FRAME.size + length
+            if end > len(inbox):
+                break
+            messages.append((kind, bytes(inbox[offset + FRAME.size:end])))
+            offset = end
+        del inbox[:offset]
+        return messages
+
+    def close(self):
+        self.closed = True
+        self.sock.close()
+
+
+class Server:
+    """Runs the authoritative World and streams it to up to `players` clients.
+
+    Call serve() to run at the fixed TICK rate, or poll() and step()
+    yourself (as bench does). The world only advances while someone is
+    connected; empty slots stand still.
+    """
+
+    def __init__(self, host="127.0.0.1", port=COOP_PORT, players=2, seed=None, hunter=False, expedition=False):
+        if not 1 <= players <= MAX_PLAYERS:
+            raise ValueError(f"co-op takes 1 to {MAX_PLAYERS} players, not {players}")
+        self.world = World(seed=seed, hunter=hunter, expedition=expedition, prefetch=True, players=players)
+        for slot in range(players):
+            self.world.leave(slot)  # until someone connects to it
+        self.flags = (HUNTER if hunter else 0) | (EXPEDITION if expedition else 0)
+        self.listener = socket.create_server((host, port))
+        self.listener.setblocking(False)
+        self.address = self.listener.getsockname()
+        self.selector = selectors.DefaultSelector()
+        self.selector.register(self.listener, selectors.EVENT_READ)
+        self.slots = [None] * players   # _Connection per player, None when free
+        self.inputs = [Inputs()] * players
+        self.tick = 0
+        self.maze = None       # the maze the last LEVEL described
+        self.level = b""       # that LEVEL message
+        self.sent = None       # entity positions as of the last snapshot
+        self.velocity = None   # and how far they moved in it
+        self.bytes_sent = 0    # snapshot and level bytes, per client
+        self.encode_time = 0.0
+
+    def poll(self, timeout=0):
+        """Accept new clients and read inputs, waiting up to timeout."""
+        for key, _ in self.selector.select(timeout):
+            if key.fileobj is self.listener:
+                self._accept()
+            else:
+                slot = key.data
+                conn = self.slots[slot]
+                for kind, payload in conn.receive():
+                    if kind == INPUT and payload:
+                        self.inputs[slot] = INPUTS[payload[0] & (len(INPUTS) - 1)]
+                if conn.closed:
+                    self._drop(slot)
+
+    def _accept(self):
+        sock, _ = self.listener.accept()
+        conn = _Connection(sock)
+        if None not in self.slots:
+            conn.close()  # full
+            return
+        slot = self.slots.index(None)
+        self.slots[slot] = conn
+        self.world.join(slot)
+        self.selector.register(sock, selectors.EVENT_READ, slot)
+        conn.send(frame(HELLO, WELCOME.pack(slot, len(self.slots), self.flags)))
+        if self.sent is not None:
+            # Catch up on the level and the state so far: a keyframe of the
+            # last positions but one, then the last movement on top of it
+            header, before = self._header(None), self.sent - self.velocity
+            conn.send(self.level + self._snapshot(np.zeros_like(before), before, header)
+                      + self._snapshot(before, self.sent, header))
+
+    def _drop(self, slot):
+        conn = self.slots[slot]
+        self.selector.unregister(conn.sock)
+        conn.close()
+        self.slots[slot] = None
+        self.inputs[slot] = Inputs()
+        self.world.leave(slot)
+
+    @property
+    def clients(self):
+        return [conn for conn in self.slots if conn is not None]
+
+    def step(self):
+        """Advance the world one tick and send everyone the result."""
+        outcome = self.world.step(tuple(self.inputs), TICK)
+        self.tick += 1
+        self.broadcast(outcome)
+        return outcome
+
+    def broadcast(self, outcome=None):
+        start = time.perf_counter()
+        world = self.world
+        message = b""
+        if world.maze is not self.maze:
+            self.maze = world.maze
+            self.level = message = self._level()
+            self.sent = None
+        current = positions(world)
+        if self.sent is None:
+            # Keyframe: from zeros, and nothing has moved yet
+            message += self._snapshot(np.zeros_like(current), current, self._header(outcome))
+            self.velocity = np.zeros_like(current)
+        else:
+            message += self._snapshot(self.sent + self.velocity, current, self._header(outcome))
+            self.velocity = current - self.sent
+        self.sent = current
+        self.encode_time += time.perf_counter() - start
+        self.bytes_sent += len(message)
+        for slot, conn in enumerate(self.slots):
+            if conn is None:
+                continue
+            conn.send(message)
+            if conn.closed or len(conn.outbox) > MAX_BACKLOG:
+                self._drop(slot)
+
+    def _level(self):
+        world = self.world
+        maze = world.maze
+        powerups = [xy for pu in world.powerups[:2] for xy in pu.rect.topleft]
+        header = LEVEL_HEADER.pack(maze.rows, maze.cols, world.goal_row, world.goal_col,
+                                   len(world.drones), world.enemy_speed, *powerups)
+        return frame(LEVEL, header + zlib.compress(bytes(maze.cells)))
+
+    def _header(self, outcome):
+        world = self.world
+        flags = (GLITCH_ON if world.glitch_mode else 0) | OUTCOMES.index(outcome) << 1
+        for i, pu in enumerate(world.powerups[:2]):
+            flags |= powerup_state(world, pu) << (3 + 2 * i)
+        active = sum(1 << i for i, player in enumerate(world.players) if player.active)
+        return SNAPSHOT_HEADER.pack(
+            self.tick, world.level, world.enemy_speed, world.score, world.final_score, flags,
+            min(max(round(world.glitch_timer / TICK), 0), 255), min(max(round(world.cooldown_timer / TICK), 0), 255),
+            active)
+
+    @staticmethod
+    def _snapshot(predicted, current, header):
+        return frame(SNAPSHOT, header + pack_deltas(predicted, current))
+
+    def serve(self, stop=None):
+        """Tick at the fixed rate until stop (a threading.Event) is set."""
+        next_tick = time.perf_counter()
+        while not (stop and stop.is_set()):
+            self.poll(max(next_tick - time.perf_counter(), 0))
+            now = time.perf_counter()
+            if now < next_tick:
+                continue
+            if self.clients:
+                self.step()
+            # Don't try to catch up after a stall
+            next_tick = max(next_tick + TICK, now - TICK)
+        self.close()
+
+    def close(self):
+        for slot, conn in enumerate(self.slots):
+            if conn is not None:
+                self._drop(slot)
+        self.selector.close()
+        self.listener.close()
+        self.world.close()
+
+
+class Client:
+    """One spy's end: sends inputs and mirrors the server's World.
+
+    self.world is a World kept in sync from LEVEL and SNAPSHOT messages
+    (its player is this client's spy), so PlayScene draws it like a local
+    game; it is never stepped here. It exists once wait() returns.
+    """
+
+    def __init__(self, address, images=None, timeout=5.0):
+        self.address = address
+        self.conn = _Connection(socket.create_connection(address, timeout=timeout))
+        self.images = images or {}
+        self.world = None
+        self.slot = None
+        self.tick = -1
+        self.sent = None        # entity positions as of the last snapshot
+        self.velocity = None    # and how far they moved in it
+        self.received_at = 0.0  # when the last snapshot arrived
+        self.bytes_received = 0
+        self.mask = None        # last input mask sent
+
+    def wait(self, timeout=5.0):
+        """Block until the level and a first snapshot are in, ready to draw."""
+        deadline = time.perf_counter() + timeout
+        while self.sent is None:
+            if time.perf_counter() > deadline or self.conn.closed:
+                self.close()
+                host, port = self.address[:2]
+                raise ConnectionError(f"no game from {host}:{port} (server full or not running?)")
+            self.poll(0.05)
+        return self
+
+    def send_inputs(self, inputs):
+        mask = input_mask(inputs)
+        if mask != self.mask:
+            self.conn.send(frame(INPUT, bytes((mask,))))
+            self.mask = mask
+
+    def poll(self, timeout=0):
+        """Apply everything the server sent, waiting up to timeout for it.
+
+        Returns "lose" or "goal" if any tick received had that outcome.
+        """
+        if timeout:
+            select.select([self.conn.sock], [], [], timeout)
+        outcome = None
+        for kind, payload in self.conn.receive():
+            self.bytes_received += FRAME.size + len(payload)
+            if kind == SNAPSHOT:
+                result = self._snapshot(payload)
+                if result == "lose" or outcome is None:
+                    outcome = result or outcome
+            elif kind == LEVEL:
+                self._level(payload)
+            elif kind == HELLO:
+                self._hello(payload)
+        return outcome
+
+    def alpha(self):
+        """How far the drawing should be between the last two snapshots."""
+        return min((time.perf_counter() - self.received_at) / TICK, 1.0)
+
+    def _hello(self, payload):
+        self.slot, players, flags = WELCOME.unpack(payload)
+        self.world = World(seed=0, images=self.images, hunter=bool(flags & HUNTER),
+                           expedition=bool(flags & EXPEDITION), players=players)
+        self.world.player = self.world.players[self.slot]
+
+    def _level(self, payload):
+        world = self.world
+        rows, cols, goal_row, goal_col, drones, speed, *powerups = LEVEL_HEADER.unpack_from(payload)
+        world.maze = Grid(rows, cols, bytearray(zlib.decompress(payload[LEVEL_HEADER.size:])))
+        world.goal_row, world.goal_col = goal_row, goal_col
+        world.goal_rect.topleft = (goal_col * TILE, goal_row * TILE + INFO_BAR_HEIGHT)
+        world.drones = DroneSwarm([(0, 0)] * drones, [0] * drones, speed, TILE)
+        world.enemies = [Enemy(world.drones, i, image=self.images.get("enemy")) for i in range(drones)]
+        world.pickup_cells.clear()
+        for pu, x, y in zip(world.powerups, powerups[::2], powerups[1::2]):
+            pu.rect.topleft = (x, y)
+            pu.active = False
+            if x >= 0:
+                world.pickup_cells.insert(pu, x, y)
+        self.sent = None
+
+    def _snapshot(self, payload):
+        world = self.world
+        (self.tick, world.level, world.enemy_speed, world.score, world.final_score, flags,
+         glitch, cooldown, active) = SNAPSHOT_HEADER.unpack_from(payload)
+        for i, player in enumerate(world.players):
+            player.active = bool(active >> i & 1)
+        world.glitch_mode = bool(flags & GLITCH_ON)
+        world.glitch_timer, world.cooldown_timer = glitch * TICK, cooldown * TICK
+        for i, pu in enumerate(world.powerups[:2]):
+            state = flags >> (3 + 2 * i) & 3
+            pu.active = state == ACTIVE
+            if state != ON_BOARD and pu in world.pickup_cells:
+                world.pickup_cells.remove(pu)
+                pu.rect.topleft = (-100, -100)
+
+        keyframe = self.sent is None
+        if keyframe:
+            current, _ = unpack_deltas(np.zeros((len(world.players) + len(world.drones), 2), dtype=np.int64),
+                                       payload, SNAPSHOT_HEADER.size)
+            self.velocity = np.zeros_like(current)
+        else:
+            current, _ = unpack_deltas(self.sent + self.velocity, payload, SNAPSHOT_HEADER.size)
+            self.velocity = current - self.sent
+        self.sent = current
+        players = len(world.players)
+        for player, xy in zip(world.players, self.sent[:players].tolist()):
+            player.prev_topleft = player.rect.topleft
+            player.rect.topleft = xy
+        world.drones.place(self.sent[players:, 0].copy(), self.sent[players:, 1].copy())
+        if keyframe:
+            # A new level (or just joined): nothing to interpolate from
+            for player in world.players:
+                player.prev_topleft = player.rect.topleft
+            world.drones.prev_x, world.drones.prev_y = world.drones.x, world.drones.y
+        self.received_at = time.perf_counter()
+        return OUTCOMES[flags >> 1 & 3]
+
+    def close(self):
+        self.conn.close()
+        if self.world is not None:
+            self.world.close()
+
+
+def bench(drone_counts, clients=2, ticks=300, seed=1, expedition=True):
+    """Play random inputs over localhost and check every client's mirror.
+
+    Server and clients run in lock-step in this thread. For each drone
+    count, prints the bytes a client receives on a typical (median) tick
+    and on average, which includes the new levels (mazes and keyframes)
+    sent when the spies are caught, and the time per tick spent encoding.
+    Runs in expedition mode by default so that even big swarms leave the
+    spies some room.
+    """
+    for drones in drone_counts:
+        server = Server(port=0, players=clients, seed=seed, expedition=expedition)
+        # Keep the drone count fixed across levels and restarts
+        server.world.enemies_for_level = lambda level, drones=drones: drones
+        server.world.reset_maze(drones)
+        ends = [Client(server.address) for _ in range(clients)]
+        while len(server.clients) < clients:
+            server.poll(1.0)
+        server.step()
+        for end in ends:
+            end.wait()
+        rng = random.Random(seed)
+        sizes, levels, encode = [], 0, server.encode_time
+        for _ in range(ticks):
+            for end in ends:
+                end.send_inputs(INPUTS[rng.randrange(len(INPUTS))])
+            server.poll()
+            maze, before = server.maze, ends[0].bytes_received
+            server.step()
+            levels += server.maze is not maze
+            for end in ends:
+                while end.tick < server.tick:
+                    end.poll(1.0)
+                if not (np.array_equal(end.sent, positions(server.world))
+                        and (end.world.level, end.world.score) == (server.world.level, server.world.score)):
+                    raise AssertionError(f"client {end.slot} out of sync at tick {server.tick}")
+            sizes.append(ends[0].bytes_received - before)
+        print(f"{drones:5d} drones: {int(np.median(sizes)):5d} B/tick typical, {np.mean(sizes):7.1f} mean "
+              f"({levels} new levels), encoding {(server.encode_time - encode) / ticks * 1000:.3f} ms/tick")
+        for end in ends:
+            end.close()
+        server.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+    serve = commands.add_parser("serve", help="run a co-op server")
+    serve.add_argument("--host", default="127.0.0.1", help="address to listen on (0.0.0.0 for the LAN)")
+    serve.add_argument("--port", type=int, default=COOP_PORT)
+    serve.add_argument("--players", type=int, default=2)
+    serve.add_argument("--seed", type=int)
+    serve.add_argument("--hunter", action="store_true")
+    serve.add_argument("--expedition", action="store_true")
+    run = commands.add_parser("bench", help="measure bandwidth and server time over localhost")
+    run.add_argument("--drones", default="10,100,1000", help="comma-separated drone counts")
+    run.add_argument("--single-screen", action="store_true", help="one-screen mazes instead of expedition ones")
+    run.add_argument("--clients", type=int, default=2)
+    run.add_argument("--ticks", type=int, default=300)
+    args = parser.parse_args(argv)
+
+    if args.command == "bench":
+        bench([int(n) for n in args.drones.split(",")], args.clients, args.ticks, expedition=not args.single_screen)
+        return 0
+    server = Server(args.host, args.port, args.players, args.seed, args.hunter, args.expedition)
+    print(f"serving {args.players}-player co-op on {server.address[0]}:{server.address[1]}")
+    try:
+        server.serve()
+    except KeyboardInterrupt:
+        server.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
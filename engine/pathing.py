@@ -0,0 +1,128 @@
+import numpy as np
+from engine.drones import DIRECTIONS
+from engine.grid import FREE, GOAL
+
+
+def find_farthest_free_tile(maze, player_pos):
+    """Free tile the longest walk away from player_pos."""
+    return MazeAnalysis(maze, player_pos, walkable=(FREE,)).farthest()
+
+
+def _bfs(maze, start, walkable):
+    """Breadth-first search over the flat cell buffer of a Grid.
+
+    Returns the flat indices reached from start (row, col) in visiting
+    order, and the step count of each.
+    """
+    cols = maze.cols
+    below = len(maze.cells) - cols
+    unvisited = maze.mask(walkable)
+    first = start[0] * cols + start[1]
+    unvisited[first] = 0
+    order, steps = [first], [0]
+    frontier, step = order[:], 0
+    while frontier:
+        step += 1
+        reached = []
+        for i in frontier:
+            # Neighbours up, down, left, right
+            if i >= cols and unvisited[i - cols]:
+                unvisited[i - cols] = 0
+                reached.append(i - cols)
+            if i < below and unvisited[i + cols]:
+                unvisited[i + cols] = 0
+                reached.append(i + cols)
+            c = i % cols
+            if c > 0 and unvisited[i - 1]:
+                unvisited[i - 1] = 0
+                reached.append(i - 1)
+            if c < cols - 1 and unvisited[i + 1]:
+                unvisited[i + 1] = 0
+                reached.append(i + 1)
+        order += reached
+        steps += [step] * len(reached)
+        frontier = reached
+    return order, steps
+
+
+def get_tile_distances(maze, start, walkable=(0,)):
+    """BFS step counts from start to every tile reachable through walkable values."""
+    order, steps = _bfs(maze, start, walkable)
+    cols = maze.cols
+    return {(i // cols, i % cols): step for i, step in zip(order, steps)}
+
+
+def get_reachable_tiles(maze, start):
+    return set(get_tile_distances(maze, start))
+
+
+class MazeAnalysis:
+    """Facts about one maze that placement code needs, computed once.
+
+    Holds the tiles reachable from start (in BFS order and as a set), the BFS
+    step count from start to every tile in self.distance (-1 where
+    unreachable), and the free tiles in row-major order. Taken when the
+    maze is generated, before the goal is placed.
+    """
+
+    def __init__(self, maze, start=(1, 1), walkable=(FREE, GOAL)):
+        self.maze = maze
+        self.start = start
+        order, steps = _bfs(maze, start, walkable)
+        self.distance = np.full((maze.rows, maze.cols), -1, dtype=np.int32)
+        self.distance.reshape(-1)[order] = steps
+        cols = maze.cols
+        # In BFS order, nearest first, so the last one is the farthest
+        self.reachable_tiles = [(i // cols, i % cols) for i in order]
+        self.reachable = set(self.reachable_tiles)
+        self.free_tiles = maze.free_tiles()
+        # Where pick-ups (and the goal) may go: reachable, but not the start
+        self.pickup_tiles = self.reachable_tiles[1:]
+
+    def spawn_tiles(self, exclude=()):
+        """Free tiles a drone may start on: anywhere but start and exclude."""
+        return [pos for pos in self.free_tiles if pos != self.start and pos not in exclude]
+
+    def farthest(self, fallback=(1, 2)):
+        """A reachable tile with the longest shortest path from start."""
+        return self.pickup_tiles[-1] if self.pickup_tiles else fallback
+
+
+class FlowField:
+    """BFS distance field towards one target tile, shared by all drones.
+
+    Recomputed only when the target changes tile; after that, the heading
+    that leads a drone one step closer is a single lookup in self.heading
+    (an index into DIRECTIONS, or -1 where there's no way closer).
+    """
+
+    def __init__(self, maze, walkable=(0, 9)):
+        self.maze = maze
+        self.walkable = walkable
+        self.target = None
+        shape = (maze.rows, maze.cols)
+        self.distance = np.full(shape, -1, dtype=np.int32)
+        self.heading = np.full(shape, -1, dtype=np.int8)
+
+    def update(self, target):
+        """Point the field at target (row, col). Returns True if it was rebuilt."""
+        if target == self.target:
+            return False
+        self.target = target
+        distance = self.distance
+        distance.fill(-1)
+        r, c = target
+        if 0 <= r < distance.shape[0] and 0 <= c < distance.shape[1]:
+            order, steps = _bfs(self.maze, target, self.walkable)
+            distance.reshape(-1)[order] = steps
+
+        # For every tile, the first direction whose neighbour is one step closer
+        padded = np.pad(distance, 1, constant_values=-1)
+        heading = self.heading
+        heading.fill(-1)
+        height, width = distance.shape
+        for index, (dx, dy) in enumerate(DIRECTIONS):
+            neighbor = padded[1 + dy:1 + dy + height, 1 + dx:1 + dx + width]
+            closer = (heading < 0) & (distance > 0) & (neighbor >= 0) & (neighbor == distance - 1)
+            heading[closer] = index
+        return True
@@ -0,0 +1,105 @@
+import json
+import time
+
+import numpy as np
+
+MAX_PHASES = 16
+
+
+class FrameProfiler:
+    """Per-phase frame timings kept in a fixed-size ring buffer.
+
+    Code calls lap(name) after each phase of the frame; the time since the
+    previous lap is added to that phase. next_frame() closes the frame into
+    the ring buffer (and the session trace, if recording). While disabled
+    every call returns immediately, so it can stay in the hot path.
+
+    With trace_path, every frame is also written to that file as it is
+    recorded, one JSON value per line, so a session of any length takes
+    no extra memory:
+
+        {"phases": [...]}      whenever a new phase shows up
+        [12.1, 0.3, ...]       a frame's phase times in ms, in that order
+        {"summary_ms": {...}}  stats() of the last frames, written by close()
+    """
+
+    def __init__(self, capacity=600, enabled=False, trace_path=None):
+        self.enabled = enabled or trace_path is not None
+        self.capacity = capacity
+        self.phases = []  # phase names, in order of first use
+        self._index = {}
+        self.samples = np.zeros((capacity, MAX_PHASES), dtype=np.float64)
+        self.totals = np.zeros(capacity, dtype=np.float64)
+        self.count = 0  # frames recorded so far
+        self.trace = open(trace_path, "w") if trace_path is not None else None
+        self._traced_phases = 0  # length of the last "phases" line written
+        self._frame = np.zeros(MAX_PHASES, dtype=np.float64)
+        self._last = None
+
+    def lap(self, name):
+        """Charge the time since the previous lap to phase name."""
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        if self._last is not None:
+            index = self._index.get(name)
+            if index is None:
+                index = self._add_phase(name)
+            if index is not None:
+                self._frame[index] += now - self._last
+        self._last = now
+
+    def _add_phase(self, name):
+        if len(self.phases) == MAX_PHASES:
+            return None
+        self._index[name] = len(self.phases)
+        self.phases.append(name)
+        return self._index[name]
+
+    def next_frame(self):
+        """Store the current frame's timings and start a new frame."""
+        if not self.enabled:
+            self._last = None
+            return
+        if self._last is not None:
+            slot = self.count % self.capacity
+            self.samples[slot] = self._frame
+            self.totals[slot] = self._frame.sum()
+            self.count += 1
+            if self.trace is not None:
+                self._write_trace()
+        self._frame[:] = 0
+        self._last = time.perf_counter()
+
+    def _write_trace(self):
+        n = len(self.phases)
+        if n != self._traced_phases:
+            self.trace.write(json.dumps({"phases": self.phases}) + "\n")
+            self._traced_phases = n
+        self.trace.write(json.dumps([round(t * 1000, 4) for t in self._frame[:n].tolist()]) + "\n")
+
+    def recent_totals(self):
+        """Whole-frame times (seconds) of the buffered frames, oldest first."""
+        if self.count < self.capacity:
+            return self.totals[:self.count]
+        slot = self.count % self.capacity
+        return np.concatenate((self.totals[slot:], self.totals[:slot]))
+
+    def stats(self):
+        """{phase: (p50, p95, p99)} in milliseconds over the buffered frames,
+        plus the same for the whole frame under "frame"."""
+        filled = min(self.count, self.capacity)
+        if not filled:
+            return {}
+        columns = {name: self.samples[:filled, i] for i, name in enumerate(self.phases)}
+        columns["frame"] = self.totals[:filled]
+        return {name: tuple(np.percentile(values, (50, 95, 99)) * 1000)
+                for name, values in columns.items()}
+
+    def close(self):
+        """Finish the session trace, if recording, with a summary line."""
+        if self.trace is None:
+            return
+        self.trace.write(json.dumps({"summary_ms": {name: list(p) for name, p in self.stats().items()}}) + "\n")
+        self.trace.close()
+        self.trace = None
@@ -0,0 +1,170 @@
+"""Record play sessions and replay them headless.
+
+    python main.py --record session.gsr               # play and record
+    python -m engine.replay session.gsr               # re-simulate and check
+    python -m engine.replay session.gsr --repeat 10   # time long sessions
+
+A recording is the World seed plus one byte of held buttons per tick, a
+CRC of the world state after each tick, and markers for the restarts
+main.py makes outside of World.step(). Everything past the header is
+zlib-compressed. Since World is deterministic for a given seed and input
+sequence, replaying re-creates the session exactly, and the first tick
+whose CRC differs points at the bug (or the change) that diverged.
+"""
+import argparse
+import struct
+import sys
+import time
+import zlib
+
+from engine.settings import TICK, HUNTER, EXPEDITION
+from engine.world import World, INPUTS, input_mask
+
+MAGIC = b"GSRP"
+VERSION = 4  # bumped whenever the same seed and inputs would play out differently
+HEADER = struct.Struct("<4sHQB")  # magic, version, seed, flags (HUNTER, EXPEDITION)
+
+# Record kinds; a tick is its input mask (below 0x80) followed by a CRC
+RESET = 0x80    # World.reset_level()
+RESTART = 0x81  # World.restart()
+
+CRC = struct.Struct("<I")
+
+
+def state_hash(world):
+    """CRC32 of everything the simulation carries from one tick to the next."""
+    player, drones = world.player, world.drones
+    crc = zlib.crc32(struct.pack(
+        "<10i2?3d", *player.rect, *world.goal_rect.topleft,
+        player.speed, world.level, world.enemy_speed, world.score,
+        world.glitch_mode, player.glitch_used, world.glitch_timer, world.cooldown_timer, float(world.final_score)))
+    for array in (drones.x, drones.y, drones.heading, drones.speed):
+        crc = zlib.crc32(array.tobytes(), crc)
+    for pu in world.powerups:
+        remaining = world.effects.remaining(pu.expiry) if pu.expiry else 0.0
+        crc = zlib.crc32(struct.pack("<4i?d", *pu.rect, pu.active, remaining), crc)
+    return crc
+
+
+class Recorder:
+    """Writes a session to path as it is played.
+
+    Set as world.recorder; World then logs every step() and restart.
+    """
+
+    def __init__(self, path, seed, hunter=False, expedition=False):
+        flags = (HUNTER if hunter else 0) | (EXPEDITION if expedition else 0)
+        header = HEADER.pack(MAGIC, VERSION, seed, flags)  # (before creating the file)
+        self.file = open(path, "wb")
+        self.file.write(header)
+        self.compressor = zlib.compressobj(9)
+        self.buffer = bytearray()
+
+    def tick(self, inputs, world):
+        self.buffer.append(input_mask(inputs))
+        self.buffer += CRC.pack(state_hash(world))
+        if len(self.buffer) >= 4096:
+            self.flush()
+
+    def reset_level(self):
+        self.buffer.append(RESET)
+
+    def restart(self):
+        self.buffer.append(RESTART)
+
+    def flush(self):
+        self.file.write(self.compressor.compress(bytes(self.buffer)))
+        self.buffer.clear()
+
+    def close(self):
+        if self.file.closed:
+            return
+        self.flush()
+        self.file.write(self.compressor.flush())
+        self.file.close()
+
+
+class Recording:
+    """A session read back from a file written by Recorder."""
+
+    def __init__(self, seed, hunter, expedition, records):
+        self.seed = seed
+        self.hunter = hunter
+        self.expedition = expedition
+        self.records = records
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            data = f.read()
+        magic, version, seed, flags = HEADER.unpack_from(data)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a Glitch Scape recording")
+        if version != VERSION:
+            raise ValueError(f"{path} is recording version {version}, expected {VERSION}")
+        return cls(seed, bool(flags & HUNTER), bool(flags & EXPEDITION), zlib.decompress(data[HEADER.size:]))
+
+    def replay(self, check=True):
+        """Re-simulate the session as fast as possible.
+
+        Returns (ticks, world). With check, raises ReplayMismatch at the
+        first tick whose state hash differs from the recorded one.
+        """
+        world = World(seed=self.seed, hunter=self.hunter, expedition=self.expedition)
+        records, step, unpack = self.records, world.step, CRC.unpack_from
+        i = ticks = 0
+        end = len(records)
+        while i < end:
+            kind = records[i]
+            if kind == RESET:
+                world.reset_level()
+                i += 1
+            elif kind == RESTART:
+                world.restart()
+                i += 1
+            else:
+                step(INPUTS[kind], TICK)
+                if check and state_hash(world) != unpack(records, i + 1)[0]:
+                    raise ReplayMismatch(ticks, world)
+                ticks += 1
+                i += 1 + CRC.size
+        world.close()
+        return ticks, world
+
+
+class ReplayMismatch(Exception):
+    """The replayed world diverged from the recorded one."""
+
+    def __init__(self, tick, world):
+        super().__init__(f"state differs from the recording at tick {tick} (level {world.level})")
+        self.tick = tick
+        self.world = world
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("path", help="recording written by main.py --record")
+    parser.add_argument("--no-check", action="store_true", help="skip comparing state hashes (pure speed run)")
+    parser.add_argument("--repeat", type=int, default=1, help="replay this many times and report the fastest")
+    args = parser.parse_args(argv)
+
+    recording = Recording.load(args.path)
+    best = None
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        try:
+            ticks, world = recording.replay(check=not args.no_check)
+        except ReplayMismatch as e:
+            print(f"{args.path}: {e}")
+            return 1
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    played = ticks * TICK
+    print(f"{args.path}: {ticks} ticks ({played:.1f}s of play) in {best:.3f}s, "
+          f"{played / best if best else float('inf'):.0f}x real time, "
+          f"level {world.level}, final hash {state_hash(world):08x}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,12 @@
+# Layout and timing shared by the simulation and the renderer
+WIDTH, HEIGHT = 800, 600
+TILE = 60
+INFO_BAR_HEIGHT = 40
+TICK = 1 / 30  # seconds of game time per simulation step
+EXPEDITION_ROWS, EXPEDITION_COLS = 45, 65  # maze size in expedition mode (5x5 screens)
+COOP_PORT = 5055  # default TCP port for co-op games
+HUNTER, EXPEDITION = 1, 2  # game mode bits, as stored in recordings and co-op messages
+
+# Glitch settings
+GLITCH_DURATION = 1.0  # seconds the glitch lasts
+GLITCH_COOLDOWN = 5.0  # seconds before next glitch
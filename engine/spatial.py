@@ -0,0 +1,71 @@
+class SpatialHash:
+    """Uniform grid of cell-sized buckets for finding entities near a rect.
+
+    Each entity is filed under the cell holding its top-left corner, so
+    moving it only touches the buckets when it crosses into another cell.
+    Entities may be up to max_size pixels wide and high; candidates()
+    looks that far up and left of the rect for ones reaching into it.
+    This is the broad phase only: callers test the candidates' actual
+    rects. Buckets keep insertion order, so results are deterministic.
+    """
+
+    def __init__(self, cell, max_size=None):
+        self.cell = cell
+        # How many cells past its own an entity can extend into
+        self.reach = ((max_size or cell) - 1 + cell - 1) // cell
+        self.buckets = {}   # (col, row) -> {key: None}
+        self.cell_of = {}   # key -> (col, row)
+
+    def __len__(self):
+        return len(self.cell_of)
+
+    def __contains__(self, key):
+        return key in self.cell_of
+
+    def move(self, key, x, y):
+        """Insert key with its top-left corner at (x, y), or update it."""
+        cell = (x // self.cell, y // self.cell)
+        old = self.cell_of.get(key)
+        if old == cell:
+            return
+        if old is not None:
+            self._unfile(key, old)
+        self.buckets.setdefault(cell, {})[key] = None
+        self.cell_of[key] = cell
+
+    insert = move
+
+    def remove(self, key):
+        old = self.cell_of.pop(key, None)
+        if old is not None:
+            self._unfile(key, old)
+
+    def _unfile(self, key, cell):
+        bucket = self.buckets[cell]
+        del bucket[key]
+        if not bucket:
+            del self.buckets[cell]
+
+    def clear(self):
+        self.buckets.clear()
+        self.cell_of.clear()
+
+    def candidates(self, rect):
+        """Keys of every entity that may overlap rect."""
+        cell, reach = self.cell, self.reach
+        c0, c1 = rect.left // cell - reach, (rect.right - 1) // cell
+        r0, r1 = rect.top // cell - reach, (rect.bottom - 1) // cell
+        found = []
+        if (c1 - c0 + 1) * (r1 - r0 + 1) > len(self.buckets):
+            # Big query (e.g. the whole view): cheaper to scan the buckets
+            for (c, r), bucket in self.buckets.items():
+                if c0 <= c <= c1 and r0 <= r <= r1:
+                    found.extend(bucket)
+            return found
+        buckets = self.buckets
+        for r in range(r0, r1 + 1):
+            for c in range(c0, c1 + 1):
+                bucket = buckets.get((c, r))
+                if bucket:
+                    found.extend(bucket)
+        return found
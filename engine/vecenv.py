@@ -0,0 +1,207 @@
+"""Run many GlitchScapeEnvs at once across worker processes.
+
+    python -m engine.vecenv --envs 16 --workers 4   # measure env-steps/s
+
+Each worker process owns a contiguous slice of the environments. Actions
+go to the workers, and observations, rewards and done flags come back,
+through shared-memory arrays, so the pipes only carry tiny "step" and
+"done" messages and nothing is pickled per step. Environments that
+finish are reset on the spot (the observation returned for them is the
+first one of the new episode).
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from engine.env import GlitchScapeEnv, ACTIONS
+
+
+def _fields(num_envs, shapes):
+    """(name, shape, dtype) of every shared array."""
+    return (
+        ("grid", (num_envs,) + shapes["grid"], np.uint8),
+        ("state", (num_envs,) + shapes["state"], np.float32),
+        ("actions", (num_envs,), np.uint8),
+        ("rewards", (num_envs,), np.float32),
+        ("terminated", (num_envs,), np.bool_),
+        ("truncated", (num_envs,), np.bool_),
+    )
+
+
+def _views(fields, buffers):
+    return {name: np.ndarray(shape, dtype, buffer=buffer.buf)
+            for (name, shape, dtype), buffer in zip(fields, buffers)}
+
+
+class _Slice:
+    """The environments one worker steps, writing into the shared arrays."""
+
+    def __init__(self, arrays, start, stop, env_options):
+        self.arrays = arrays
+        self.start = start
+        self.envs = [GlitchScapeEnv(buffers=(arrays["grid"][i], arrays["state"][i]), **env_options)
+                     for i in range(start, stop)]
+
+    def reset(self, seeds):
+        for env, seed in zip(self.envs, seeds):
+            env.reset(seed)
+
+    def step(self):
+        arrays = self.arrays
+        actions, rewards = arrays["actions"], arrays["rewards"]
+        terminated, truncated = arrays["terminated"], arrays["truncated"]
+        for i, env in enumerate(self.envs, self.start):
+            _, rewards[i], terminated[i], truncated[i], _ = env.step(actions[i])
+            if terminated[i] or truncated[i]:
+                env.reset()
+
+    def close(self):
+        for env in self.envs:
+            env.close()
+
+
+def _worker(conn, names, fields, start, stop, env_options):
+    buffers = [shared_memory.SharedMemory(name=name) for name in names]
+    envs = _Slice(_views(fields, buffers), start, stop, env_options)
+    try:
+        while True:
+            command, arg = conn.recv()
+            if command == "step":
+                envs.step()
+            elif command == "reset":
+                envs.reset(arg)
+            elif command == "close":
+                break
+            conn.send(None)
+    finally:
+        envs.close()
+        for buffer in buffers:
+            buffer.close()
+
+
+class VectorEnv:
+    """num_envs GlitchScapeEnvs stepped in lock-step by num_workers processes.
+
+    reset() and step() return batched arrays with the environment index
+    first. They are views of the shared buffers, overwritten by the next
+    call; copy what you keep. num_workers=0 runs every environment in this
+    process instead, which is handy for measuring the pool's overhead.
+    """
+
+    def __init__(self, num_envs, num_workers=None, start_method=None, **env_options):
+        if num_workers is None:
+            num_workers = os.cpu_count() or 1
+        self.num_envs = num_envs
+        self.num_workers = num_workers = min(num_workers, num_envs)
+        probe = GlitchScapeEnv(**env_options)  # (no World until reset)
+        fields = _fields(num_envs, probe.observation_shapes(probe.rows, probe.cols, probe.max_drones))
+
+        self.buffers = [shared_memory.SharedMemory(create=True, size=max(int(np.prod(shape)) * np.dtype(dtype).itemsize, 1))
+                        for _, shape, dtype in fields] if num_workers else None
+        if self.buffers:
+            self.arrays = _views(fields, self.buffers)
+        else:
+            self.arrays = {name: np.zeros(shape, dtype) for name, shape, dtype in fields}
+
+        self.workers, self.conns, self.local = [], [], None
+        if not num_workers:
+            self.local = _Slice(self.arrays, 0, num_envs, env_options)
+            return
+        context = multiprocessing.get_context(start_method)
+        names = [buffer.name for buffer in self.buffers]
+        bounds = np.linspace(0, num_envs, num_workers + 1).astype(int)
+        self.slices = list(zip(bounds[:-1].tolist(), bounds[1:].tolist()))
+        for start, stop in self.slices:
+            parent, child = context.Pipe()
+            process = context.Process(target=_worker, args=(child, names, fields, start, stop, env_options),
+                                      daemon=True)
+            process.start()
+            child.close()
+            self.workers.append(process)
+            self.conns.append(parent)
+
+    def _call(self, command, args):
+        for conn, arg in zip(self.conns, args):
+            conn.send((command, arg))
+        for conn in self.conns:
+            conn.recv()
+
+    def _observations(self):
+        return {"grid": self.arrays["grid"], "state": self.arrays["state"]}
+
+    def reset(self, seed=None):
+        """Reset every environment; with a seed, environment i gets seed + i."""
+        seeds = [None if seed is None else seed + i for i in range(self.num_envs)]
+        if self.local:
+            self.local.reset(seeds)
+        else:
+            self._call("reset", [seeds[start:stop] for start, stop in self.slices])
+        return self._observations()
+
+    def step(self, actions):
+        """Step every environment with its action (an int array of num_envs).
+
+        Returns observations, rewards, terminated and truncated.
+        """
+        arrays = self.arrays
+        arrays["actions"][:] = actions
+        if self.local:
+            self.local.step()
+        else:
+            self._call("step", [None] * self.num_workers)
+        return self._observations(), arrays["rewards"], arrays["terminated"], arrays["truncated"]
+
+    def close(self):
+        if self.local:
+            self.local.close()
+            self.local = None
+        for conn in self.conns:
+            conn.send(("close", None))
+        for process in self.workers:
+            process.join()
+        self.workers, self.conns = [], []
+        if self.buffers:
+            self.arrays = None
+            for buffer in self.buffers:
+                buffer.close()
+                buffer.unlink()
+            self.buffers = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--envs", type=int, default=8)
+    parser.add_argument("--workers", type=int, default=None, help="default: one per CPU; 0 runs in this process")
+    parser.add_argument("--seconds", type=float, default=5.0, help="how long to step for")
+    parser.add_argument("--hunter", action="store_true")
+    parser.add_argument("--expedition", action="store_true")
+    args = parser.parse_args(argv)
+
+    rng = np.random.default_rng(0)
+    with VectorEnv(args.envs, args.workers, hunter=args.hunter, expedition=args.expedition) as envs:
+        envs.reset(seed=0)
+        steps, start = 0, time.perf_counter()
+        while time.perf_counter() - start < args.seconds:
+            envs.step(rng.integers(0, ACTIONS, args.envs))
+            steps += 1
+        elapsed = time.perf_counter() - start
+        cores = min(max(envs.num_workers, 1), os.cpu_count() or 1)
+    rate = steps * args.envs / elapsed
+    print(f"{args.envs} envs on {envs.num_workers} workers ({cores} cores): "
+          f"{rate:.0f} env-steps/s, {rate / cores:.0f} per core")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
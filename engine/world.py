@@ -0,0 +1,305 @@
+import random
+from typing import NamedTuple
+
+import pygame
+from engine.settings import (HEIGHT, WIDTH, TILE, INFO_BAR_HEIGHT, TICK, GLITCH_DURATION, GLITCH_COOLDOWN,
+                             EXPEDITION_ROWS, EXPEDITION_COLS)
+from engine.entities import Player, Enemy
+from engine.drones import DroneSwarm
+from engine.effects import EffectScheduler
+from engine.spatial import SpatialHash
+from engine.levels import LevelPrefetcher, plan_level
+from engine.pathing import FlowField
+from powerups.speed import SpeedBoost
+from powerups.slow import EnemySlow
+
+
+class Inputs(NamedTuple):
+    """Buttons held during one simulation step."""
+    left: bool = False
+    right: bool = False
+    up: bool = False
+    down: bool = False
+    glitch: bool = False
+
+
+# Every possible Inputs value, indexed by its mask (bit i = Inputs._fields[i])
+INPUTS = [Inputs(*(bool(mask >> i & 1) for i in range(len(Inputs._fields))))
+          for mask in range(1 << len(Inputs._fields))]
+
+
+def input_mask(inputs):
+    """The buttons in inputs as a bitmask, the index of the same value in INPUTS."""
+    mask = 0
+    for i, held in enumerate(inputs):
+        if held:
+            mask |= 1 << i
+    return mask
+
+
+def maze_size(expedition=False):
+    """(rows, cols) of the mazes a World generates: one screen, or an
+    expedition's many."""
+    if expedition:
+        return EXPEDITION_ROWS, EXPEDITION_COLS
+    return (HEIGHT - INFO_BAR_HEIGHT) // TILE, WIDTH // TILE
+
+
+class World:
+    """All mutable game state, advanced one tick at a time by step().
+
+    Needs no display: images are optional and only used when drawing, so
+    a World can be created and stepped headless (e.g. under the SDL dummy
+    video driver) from tests, bots and tools. All randomness comes from
+    self.rng, so a seeded World replays identically.
+
+    In hunter mode drones chase the player along a shared BFS flow field
+    instead of wandering. In expedition mode the maze spans many screens
+    (the renderer follows the player with a camera) and gets drones in
+    proportion to its area. With prefetch=True the next level is generated
+    on a background thread while the current one is played; call close()
+    when done with the World.
+
+    With players > 1 several spies share the maze (co-op, see engine.net):
+    step() then takes one Inputs per player. Reaching the goal with any of
+    them clears the level for all, and a drone catching any of them ends
+    the run; spies taken out of the game with leave() (an empty slot)
+    don't count. self.player is the first one.
+    """
+
+    def __init__(self, seed=None, images=None, hunter=False, prefetch=False, expedition=False, players=1):
+        self.rng = random.Random(seed)
+        self.images = images or {}
+        self.hunter = hunter
+        self.expedition = expedition
+        screen_rows, screen_cols = maze_size()
+        self.rows, self.cols = maze_size(expedition)
+        if expedition:
+            # Drones are kept inside the play area
+            self.bounds = (self.cols * TILE - TILE, self.rows * TILE - TILE)
+        else:
+            self.bounds = (WIDTH - TILE, HEIGHT - TILE - INFO_BAR_HEIGHT)
+        self.screens = max(1, (self.rows * self.cols) // (screen_rows * screen_cols))
+        self.level = 1
+        self.enemy_speed = 2
+        self.score = 0
+        self.final_score = 0
+
+        self.glitch_mode = False
+        self.glitch_duration = GLITCH_DURATION
+        self.glitch_timer = 0       # counts down when glitch is active
+        self.glitch_cooldown = GLITCH_COOLDOWN
+        self.cooldown_timer = 0     # counts down while waiting
+
+        self.maze = None
+        self.collider = None
+        self.analysis = None  # MazeAnalysis of the current maze
+        self.players = [Player(TILE, TILE, image=self.images.get("player")) for _ in range(players)]
+        self.player = self.players[0]
+        self.drones = None
+        self.flow = None
+        self.enemies = []
+        self.powerups = []
+        self.pickup_cells = SpatialHash(TILE, max_size=TILE + 5)  # power-ups not yet picked up
+        self.effects = EffectScheduler()  # expiry of running power-up effects
+        self.goal_rect = pygame.Rect(0, 0, TILE, TILE)
+        self.goal_row, self.goal_col = 0, 0
+        self.profiler = None  # FrameProfiler to time step() phases with
+        self.recorder = None  # engine.replay.Recorder logging inputs, if any
+        self.prefetcher = LevelPrefetcher() if prefetch else None
+        self.next_seed = self.rng.getrandbits(64)
+        self.reset_maze(self.enemies_for_level(1))
+
+    # --- Add Power-ups -----
+    def spawn_speed_boost(self, tile):
+        r, c = tile
+        # Add INFO_BAR_HEIGHT to the y-coordinate when spawning
+        return SpeedBoost(c * TILE, r * TILE + INFO_BAR_HEIGHT, TILE, image=self.images.get("speed_boost"))
+
+    def spawn_enemy_slow(self, tile):
+        r, c = tile
+        # Add INFO_BAR_HEIGHT to the y-coordinate when spawning
+        return EnemySlow(c * TILE, r * TILE + INFO_BAR_HEIGHT, TILE, image=self.images.get("enemy_slow"))
+
+    # --- Reset & Game State ---
+    def enemies_for_level(self, level):
+        return (1 + level // 3) * self.screens
+
+    def reset_maze(self, num_enemies=1, seed=None):
+        """Start a new level, using the prefetched plan when it is ready.
+
+        Each level's seed is drawn from self.rng one level ahead, so the
+        layouts are the same whether or not prefetching is on. Pass a seed
+        to reproduce a particular layout.
+        """
+        if seed is None:
+            seed = self.next_seed
+        plan = None
+        if self.prefetcher is not None:
+            plan = self.prefetcher.take(self.rows, self.cols, num_enemies, seed)
+        if plan is None:
+            plan = plan_level(self.rows, self.cols, num_enemies, seed)
+        self.apply_plan(plan)
+
+        # Start on the next level while this one is played
+        self.next_seed = self.rng.getrandbits(64)
+        if self.prefetcher is not None:
+            self.prefetcher.request(self.rows, self.cols, self.enemies_for_level(self.level + 1), self.next_seed)
+
+    def apply_plan(self, plan):
+        """Swap a generated LevelPlan in as the current level."""
+        # End every running effect (restoring the player's speed)
+        self.effects.clear()
+
+        self.maze = plan.maze
+        self.collider = plan.collider
+        self.analysis = plan.analysis
+        self.goal_row, self.goal_col = plan.goal
+        # Set goal_rect position to match player coordinate system (*WITH* INFO_BAR_HEIGHT)
+        self.goal_rect.x = self.goal_col * TILE
+        self.goal_rect.y = self.goal_row * TILE + INFO_BAR_HEIGHT
+
+        # Reset player positions (and don't interpolate from the old level)
+        for player in self.players:
+            player.rect.x = TILE
+            player.rect.y = TILE + INFO_BAR_HEIGHT
+            player.prev_topleft = player.rect.topleft
+
+        # Reset enemies
+        self.drones = DroneSwarm(plan.spawns, plan.headings, self.enemy_speed, TILE, seed=plan.drone_seed)
+        self.drones.bind(self.collider)
+        self.flow = FlowField(self.maze) if self.hunter else None
+        self.enemies = [Enemy(self.drones, i, image=self.images.get("enemy")) for i in range(plan.num_enemies)]
+
+        # --- Power-Ups ---
+        self.powerups.clear()  # clear old power-ups
+
+        # future fix: maybe we choose a certain power-up to appear at random
+        self.powerups.append(self.spawn_speed_boost(plan.speed_boost))  # spawn one new speed boost
+        self.powerups.append(self.spawn_enemy_slow(plan.enemy_slow))  # spawn slow-down power-up
+        self.pickup_cells.clear()
+        for pu in self.powerups:
+            self.pickup_cells.insert(pu, *pu.rect.topleft)
+
+    def close(self):
+        """Stop the background level generator, if any."""
+        if self.prefetcher is not None:
+            self.prefetcher.close()
+            self.prefetcher = None
+
+    def pickups_at(self, rect):
+        """Power-ups still on the board that overlap rect."""
+        return [pu for pu in self.pickup_cells.candidates(rect) if pu.rect.colliderect(rect)]
+
+    def player_tile(self, player=None):
+        """(row, col) of the tile under the centre of the player."""
+        x, y = (player or self.player).rect.center
+        return (y - INFO_BAR_HEIGHT) // TILE, x // TILE
+
+    def join(self, index):
+        """Co-op: bring spy index into the game, at the start of the maze."""
+        player = self.players[index]
+        player.active = True
+        player.rect.topleft = player.prev_topleft = (TILE, TILE + INFO_BAR_HEIGHT)
+
+    def leave(self, index):
+        """Co-op: take spy index out of the game. Until it joins again the
+        drones, the goal and the power-ups ignore it."""
+        self.players[index].active = False
+
+    def reset_level(self):
+        """Regenerate the maze on the current level (e.g. back from the menu)."""
+        if self.recorder:
+            self.recorder.reset_level()
+        self.reset_maze(self.enemies_for_level(1))
+
+    def restart(self):
+        """Start a new run from level 1."""
+        if self.recorder:
+            self.recorder.restart()
+        self.level, self.enemy_speed, self.score = 1, 2, 0
+        self.reset_maze(self.enemies_for_level(1))
+
+    def step(self, inputs, dt=TICK):
+        """Advance the game by dt seconds (one fixed tick).
+
+        inputs is an Inputs, or a sequence of one per player in co-op
+        (players that aren't active are skipped). Returns "goal" when the player reached the exit, "lose" when a drone
+        caught them (the world is already reset for a new run), else None.
+        """
+        if isinstance(inputs, Inputs):
+            moves = ((self.player, inputs),)
+        else:
+            moves = tuple((player, held) for player, held in zip(self.players, inputs) if player.active)
+        players = [player for player, _ in moves]
+        prof = self.profiler
+        outcome = None
+        for player, held in moves:
+            player.prev_topleft = player.rect.topleft
+            if held.left:
+                player.move(self, -player.speed, 0)
+            if held.right:
+                player.move(self, player.speed, 0)
+            if held.up:
+                player.move(self, 0, -player.speed)
+            if held.down:
+                player.move(self, 0, player.speed)
+        if prof:
+            prof.lap("player")
+        if self.flow is not None and players:
+            # Only rebuilt when the player enters a new tile
+            self.flow.update(self.player_tile(players[0]))
+        self.drones.step(*self.bounds, self.flow)
+        if prof:
+            prof.lap("drones")
+
+        # Check goal collision
+        if any(player.rect.colliderect(self.goal_rect) for player in players):
+            self.level += 1
+            self.enemy_speed += 1
+            self.reset_maze(self.enemies_for_level(self.level))
+            self.score += 1
+            outcome = "goal"
+
+        if any(len(self.drones.overlapping(player.rect)) for player in players):
+            self.enemies.clear()
+            self.level = 1
+            self.enemy_speed = 2
+            self.final_score = self.score
+            self.score = 0
+            self.reset_maze(self.enemies_for_level(1))
+            outcome = "lose"
+        if prof:
+            prof.lap("collision")
+
+        # --- Power-Up Collision & Expiry ---
+        for player in players:
+            for pu in self.pickups_at(player.rect):
+                if not pu.active:
+                    pu.apply(self, player)
+                    self.pickup_cells.remove(pu)  # taken off the board
+        self.effects.advance(dt)
+
+        # Handle glitch input
+        # (the glitch is shared: either spy can trigger it for both)
+        if any(held.glitch for _, held in moves) and self.cooldown_timer <= 0 and not self.glitch_mode:
+            self.glitch_mode = True
+            self.glitch_timer = self.glitch_duration
+            self.cooldown_timer = self.glitch_cooldown
+            for player in self.players:
+                player.glitch_used = False
+
+        # Update glitch timers
+        if self.glitch_mode:
+            self.glitch_timer -= dt
+            if self.glitch_timer <= 0:
+                self.glitch_mode = False
+        else:
+            if self.cooldown_timer > 0:
+                self.cooldown_timer -= dt
+        if prof:
+            prof.lap("powerups")
+        if self.recorder:
+            self.recorder.tick(inputs, self)
+
+        return outcome
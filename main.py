@@ -1,20 +1,52 @@
 #!/usr/bin/env python3
 
-import pygame, sys, random, math, collections, time
-from powerups.speed import SpeedBoost
-from powerups.slow import EnemySlow
+import time
+LAUNCHED = time.perf_counter()  # --measure-startup counts from here
+
+import pygame, sys, math, argparse, random, atexit, threading
+from concurrent.futures import Future
+from engine.settings import WIDTH, HEIGHT, TILE, INFO_BAR_HEIGHT, TICK, COOP_PORT
+from engine.world import World, Inputs
+from engine.profiler import FrameProfiler
+from render.maze_layer import MazeLayer, ChunkedMazeLayer
+from render.camera import Camera
+from render.scene import PlayScene
+from render.text_cache import TextCache, GLOW_PEAK_ALPHA
+from render.background import ScrollingGrid
+from render.profiler_overlay import ProfilerOverlay
+from render.assets import SpriteAtlas, LazyFont
+from render.present import Presenter
+
+parser = argparse.ArgumentParser(description="Glitch Scape")
+parser.add_argument("--hunter", action="store_true", help="drones chase the player")
+parser.add_argument("--expedition", action="store_true", help="mazes many screens in size, with a scrolling view")
+parser.add_argument("--profile-trace", metavar="PATH",
+                    help="write per-phase frame timings to PATH as they are recorded (one JSON line per frame)")
+parser.add_argument("--seed", type=int, help="seed for the level layouts (random by default)")
+parser.add_argument("--record", metavar="PATH",
+                    help="record the session to PATH for python -m engine.replay")
+parser.add_argument("--host", type=int, nargs="?", const=COOP_PORT, metavar="PORT",
+                    help=f"host a two-player co-op game on this machine (port {COOP_PORT} by default) and play in it")
+parser.add_argument("--join", metavar="HOST:PORT", help="join a co-op game")
+parser.add_argument("--measure-startup", action="store_true",
+                    help="print how long the menu and the first level took to be ready, then exit")
+args = parser.parse_args()
+if args.record and (args.host is not None or args.join):
+    parser.error("--record only works for single-player games")
+if args.seed is not None and not 0 <= args.seed < 1 << 64:
+    parser.error("--seed must be between 0 and 2**64 - 1")  # recordings store it in 8 bytes
+if args.join:
+    join_host, _, join_port = args.join.rpartition(":")
+    if not join_port.isdigit():
+        parser.error("--join takes HOST:PORT, e.g. localhost:5055")
 
 
 # --- Setup ---
-pygame.init()
-pygame.mixer.init()  # Make sure mixer is initialized
-WIDTH, HEIGHT = 800, 600
-TILE = 60
-
-# --- Fullscreen Setup ---
-# Get the dimensions of the user's monitor
-info = pygame.display.Info()
-DESKTOP_WIDTH, DESKTOP_HEIGHT = info.current_w, info.current_h
+# Only the display (which brings up the event queue too) and fonts are
+# started before the menu; audio and the first level load in the background
+# while it is showing, and fonts for other screens open on first use
+pygame.display.init()
+pygame.font.init()
 is_fullscreen = False
 
 # The 'screen' is the actual window, which can change size
@@ -24,28 +56,45 @@ game_surface = pygame.Surface((WIDTH, HEIGHT))
 
 pygame.display.set_caption("Glitch Scape")
 clock = pygame.time.Clock()
+# The simulation always advances in fixed TICK steps; during play, frames are
+# rendered as fast as they can be presented (uncapped) and interpolate
+# sprites between ticks
+MAX_FRAME_TIME = 0.25  # seconds; longer stalls are not caught up on
+GLOW_SPEED = 3.0       # portal glow phase per second
 state = "MENU"
-INFO_BAR_HEIGHT = 40
+# Only redraw and present the parts of the screen that changed during play
+# (set to False to redraw the full frame every tick)
+DIRTY_RECTS = True
 
 # --- Load background music ---
-try:
-    pygame.mixer.music.load("media/background.mp3")  # adjust path as needed
-    pygame.mixer.music.set_volume(0.3)  # optional: lower volume so it's not too loud
-except pygame.error as e:
-    print(f"Could not load music: {e}")
+def start_music():
+    """Open the audio device and loop the music; both can take a while, so
+    this runs on its own thread and the menu doesn't wait for it."""
+    try:
+        pygame.mixer.init()
+        pygame.mixer.music.load("media/background.mp3")  # adjust path as needed
+        pygame.mixer.music.set_volume(0.3)  # optional: lower volume so it's not too loud
+        pygame.mixer.music.play(-1)  # loop indefinitely
+    except pygame.error as e:
+        print(f"Could not load music: {e}")
+
+threading.Thread(target=start_music, daemon=True).start()
 
 
 # --- Load Images ---
-# Load and scale power-up images once
+# All sprites are scaled to one tile and packed into a single atlas, which is
+# cached on disk (in .cache/) so later startups skip loading the full-size PNGs
 try:
-    speed_boost_image = pygame.image.load('media/lightning2.png').convert_alpha()
-    speed_boost_image = pygame.transform.scale(speed_boost_image, (TILE, TILE))
-    enemy_slow_image = pygame.image.load('media/snowflake3.png').convert_alpha()
-    enemy_slow_image = pygame.transform.scale(enemy_slow_image, (TILE, TILE))
-    enemy_image = pygame.image.load('media/drone.png').convert_alpha()
-    enemy_image = pygame.transform.scale(enemy_image, (TILE, TILE))
-    player_image = pygame.image.load('media/player.png').convert_alpha()
-    player_image = pygame.transform.scale(player_image, (TILE, TILE))
+    atlas = SpriteAtlas({
+        "speed_boost": "media/lightning2.png",
+        "enemy_slow": "media/snowflake3.png",
+        "enemy": "media/drone.png",
+        "player": "media/player.png",
+    }, TILE).load()
+    speed_boost_image = atlas.sprite("speed_boost")
+    enemy_slow_image = atlas.sprite("enemy_slow")
+    enemy_image = atlas.sprite("enemy")
+    player_image = atlas.sprite("player")
 except pygame.error as e:
     print(f"Error loading image: {e}")
     speed_boost_image = None # or a default surface
@@ -54,10 +103,14 @@ except pygame.error as e:
     player_image = None
 
 # --- Load Fonts ---
-TITLE_FONT = pygame.font.Font("media/PressStart2P-Regular.ttf", 59)
-SUBTITLE_FONT = pygame.font.Font("media/PressStart2P-Regular.ttf", 21)
-HELP_FONT = pygame.font.Font("media/PressStart2P-Regular.ttf", 18)
-MENU_FONT = pygame.font.Font("media/PressStart2P-Regular.ttf", 39)
+# Fonts are opened on first use and text is rendered into text_cache the
+# first time it's drawn, so screens that are never shown cost nothing
+TITLE_FONT = LazyFont("media/PressStart2P-Regular.ttf", 59)
+SUBTITLE_FONT = LazyFont("media/PressStart2P-Regular.ttf", 21)
+HELP_FONT = LazyFont("media/PressStart2P-Regular.ttf", 18)
+MENU_FONT = LazyFont("media/PressStart2P-Regular.ttf", 39)
+DEBUG_FONT = LazyFont("media/PressStart2P-Regular.ttf", 8)
+text_cache = TextCache()
 
 
 # Colors
@@ -68,45 +121,43 @@ NEON_GREEN = (19, 235, 221)
 NEON_YELLOW = (255, 255, 0)
 WHITE = (255, 255, 255)
 
+# Menu background: teal-ish neon grid, spaced 40px, dimmed so text pops
+# (overlay alpha: 0 clear → 255 opaque)
+menu_grid = ScrollingGrid((WIDTH, HEIGHT), 40, BLACK, (0, 255, 200), 150)
+
+# Scales game_surface to fit the window (letterboxed) and shows it
+presenter = Presenter((WIDTH, HEIGHT), BLACK)
+presenter.resize(screen)
+
+def quit_game():
+    profiler.close()
+    # (if the World is still loading, its thread is just left to die with us)
+    if world_loader.done() and not world_loader.exception():
+        world_loader.result().close()
+    if client:
+        client.close()
+    if server:
+        server_stop.set()
+    pygame.quit()
+    sys.exit()
+
 def draw_scrolling_grid(offset):
     """Draw a scrolling neon grid background."""
-    grid_color = (0, 255, 200)  # teal-ish neon
-    spacing = 40  # grid spacing
-    # Dark background
-    game_surface.fill(BLACK)
-
-    # Vertical lines
-    for x in range(0, WIDTH, spacing):
-        pygame.draw.line(game_surface, grid_color, (x, 0), (x, HEIGHT), 1)
-
-    # Horizontal lines (scrolling)
-    for y in range(-spacing, HEIGHT, spacing):
-        pygame.draw.line(game_surface, grid_color, (0, y + offset), (WIDTH, y + offset), 1)
-
-    # Overlay to dim so text pops
-    overlay = pygame.Surface((WIDTH, HEIGHT))
-    overlay.set_alpha(150)  # adjust transparency: 0 clear → 255 opaque
-    overlay.fill(BLACK)
-    game_surface.blit(overlay, (0, 0))
+    menu_grid.draw(game_surface, offset)
 
 def draw_blur_glow_text(text, font, color, glow_color, pos):
     """Draws text with a soft blurred neon glow."""
     x, y = pos
     t = time.time()
-    pulse_alpha = int(80 + 40 * math.sin(t * 1))  # 10-150 for glow intensity
-    
-    # Render the glow layers with increasing blur radius
-    for radius in range(1, 8, 2):  # 1,3,5,7
-        glow_surf = font.render(text, True, glow_color)
-        glow_surf.set_alpha(pulse_alpha // radius)  # further layers are fainter
-        # Draw at 8 directions around center
-        for dx in (-radius, 0, radius):
-            for dy in (-radius, 0, radius):
-                if dx != 0 or dy != 0:
-                    game_surface.blit(glow_surf, (x + dx, y + dy))
-    
+    pulse_alpha = int(80 + 40 * math.sin(t * 1))  # 40-120 for glow intensity
+
+    # The glow layers are pre-composited; only their alpha pulses
+    glow_surf, pad = text_cache.glow(text, font, glow_color)
+    glow_surf.set_alpha(pulse_alpha * 255 // GLOW_PEAK_ALPHA)
+    game_surface.blit(glow_surf, (x - pad, y - pad))
+
     # Draw main text on top
-    game_surface.blit(font.render(text, True, color), pos)
+    game_surface.blit(text_cache.render(text, font, color), pos)
 
 
 def draw_menu():
@@ -115,27 +166,24 @@ def draw_menu():
     help_font = HELP_FONT
     
     offset = 0
-    subtitle = subtitle_font.render("Press ENTER to Start", True, NEON_PINK)
-    help_text = help_font.render("Press H for How to Play", True, WHITE)
+    subtitle = text_cache.render("Press ENTER to Start", subtitle_font, NEON_PINK)
+    help_text = text_cache.render("Press H for How to Play", help_font, WHITE)
 
     waiting = True
     while waiting:
-        global screen, is_fullscreen # Allow modifying these global variables
+        check_loaded()
+        if client:
+            follow_server()
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
+                quit_game()
             if event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_RETURN:
                     waiting = False
                 elif event.key == pygame.K_h:
                     draw_instructions()  # show how to play
                 elif event.key == pygame.K_f:
-                    is_fullscreen = not is_fullscreen
-                    if is_fullscreen:
-                        screen = pygame.display.set_mode((DESKTOP_WIDTH, DESKTOP_HEIGHT), pygame.FULLSCREEN)
-                    else:
-                        screen = pygame.display.set_mode((WIDTH, HEIGHT))
+                    toggle_fullscreen()
 
 
         # Animate scrolling background
@@ -155,18 +203,16 @@ def draw_menu():
         game_surface.blit(help_text, ((WIDTH - help_text.get_width()) // 2, HEIGHT // 2 + 50))
 
         # --- Final Blit to the Display ---
-        screen.fill(BLACK)
-        game_rect = game_surface.get_rect(center=screen.get_rect().center)
-        screen.blit(game_surface, game_rect)
-        pygame.display.flip()
-        
+        presenter.present(game_surface)
+        if args.measure_startup:
+            report_startup()
+
         clock.tick(60)
 
 
 
 
 def draw_instructions():
-    global screen, is_fullscreen # Allow modifying these global variables
     font_title = MENU_FONT
     font_text = HELP_FONT
     font_controls = SUBTITLE_FONT
@@ -174,10 +220,10 @@ def draw_instructions():
     offset = 0
 
     # Title
-    title = font_title.render("How to Play", True, NEON_BLUE)
+    title = text_cache.render("How to Play", font_title, NEON_BLUE)
  
     # Controls section
-    controls_title = font_controls.render("Controls", True, NEON_PINK)
+    controls_title = text_cache.render("Controls", font_controls, NEON_PINK)
 
     controls = [
         "Arrow keys / WASD to move",
@@ -189,24 +235,21 @@ def draw_instructions():
     ]
 
     # Footer
-    footer = font_footer.render("Press ESC to return to Menu", True, NEON_BLUE)
+    footer = text_cache.render("Press ESC to return to Menu", font_footer, NEON_BLUE)
 
     # Wait loop
     waiting = True
     while waiting:
+        if client:
+            follow_server()
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
+                quit_game()
             if event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_ESCAPE:
                     waiting = False
                 elif event.key == pygame.K_f: # Fullscreen toggle
-                    is_fullscreen = not is_fullscreen
-                    if is_fullscreen:
-                        screen = pygame.display.set_mode((DESKTOP_WIDTH, DESKTOP_HEIGHT), pygame.FULLSCREEN)
-                    else:
-                        screen = pygame.display.set_mode((WIDTH, HEIGHT))
+                    toggle_fullscreen()
 
         # Animate offset
         offset = (offset + 0.35) % 40  # scrolling speed
@@ -221,7 +264,7 @@ def draw_instructions():
         y_offset += 100
 
         for line in controls:
-            control_surface = font_text.render(line, True, WHITE)
+            control_surface = text_cache.render(line, font_text, WHITE)
             game_surface.blit(control_surface, ((WIDTH - control_surface.get_width()) // 2, y_offset))
             y_offset += 30
 
@@ -229,10 +272,7 @@ def draw_instructions():
         game_surface.blit(footer, ((WIDTH - footer.get_width()) // 2, HEIGHT - 40))
 
         # --- Final Blit to the Display ---
-        screen.fill(BLACK)
-        game_rect = game_surface.get_rect(center=screen.get_rect().center)
-        screen.blit(game_surface, game_rect)
-        pygame.display.flip()
+        presenter.present(game_surface)
 
         clock.tick(60)
 
@@ -240,9 +280,9 @@ def draw_instructions():
 
 def draw_pause():
     font = MENU_FONT
-    pause_text = font.render("Paused", True, NEON_PINK)
-    subtitle = SUBTITLE_FONT.render("ENTER to Resume, ESC for Menu", True, NEON_BLUE)
-    subtitle2 = SUBTITLE_FONT.render("F for Fullscreen", True, NEON_BLUE)
+    pause_text = text_cache.render("Paused", font, NEON_PINK)
+    subtitle = text_cache.render("ENTER to Resume, ESC for Menu", SUBTITLE_FONT, NEON_BLUE)
+    subtitle2 = text_cache.render("F for Fullscreen", SUBTITLE_FONT, NEON_BLUE)
     game_surface.fill(BLACK)
     game_surface.blit(pause_text, ((WIDTH - pause_text.get_width()) // 2, HEIGHT // 3))
     game_surface.blit(subtitle, ((WIDTH - subtitle.get_width()) // 2, HEIGHT // 2))
@@ -250,359 +290,164 @@ def draw_pause():
 
 def draw_lose(score):
     font = TITLE_FONT
-    lose_text = font.render("GAME OVER", True, NEON_PINK)
-    subtitle = SUBTITLE_FONT.render("ESC for Menu, ENTER to Restart", True, NEON_BLUE)
-    score_text = MENU_FONT.render(f"Score: {score}", True, NEON_YELLOW)
+    lose_text = text_cache.render("GAME OVER", font, NEON_PINK)
+    # In co-op the server has already started the next run; ENTER just
+    # drops back into it
+    restart = "ENTER to Rejoin" if client else "ENTER to Restart"
+    subtitle = text_cache.render(f"ESC for Menu, {restart}", SUBTITLE_FONT, NEON_BLUE)
+    score_text = text_cache.render(f"Score: {score}", MENU_FONT, NEON_YELLOW)
     game_surface.fill(BLACK)
     game_surface.blit(lose_text, ((WIDTH - lose_text.get_width()) // 2, HEIGHT // 3))
     game_surface.blit(score_text, ((WIDTH - score_text.get_width()) // 2, HEIGHT // 2))
     game_surface.blit(subtitle, ((WIDTH - subtitle.get_width()) // 2, HEIGHT // 2 + 80))
 
-# --- Maze Generation ---
-
-def make_maze(rows, cols):
-    maze = [[1 for _ in range(cols)] for _ in range(rows)]
-
-    def carve(r, c):
-        directions = [(0,2),(0,-2),(2,0),(-2,0)]
-        random.shuffle(directions)
-        for dr, dc in directions:
-            nr, nc = r + dr, c + dc
-            if 0 < nr < rows and 0 < nc < cols and maze[nr][nc] == 1:
-                maze[r + dr//2][c + dc//2] = 0  # remove wall in between
-                maze[nr][nc] = 0
-                carve(nr, nc)
-
-    maze[1][1] = 0
-    carve(1, 1)
-
-    return maze
-
-def add_loops(maze, extra_paths=8):
-    rows, cols = len(maze), len(maze[0])
-    for _ in range(extra_paths):
-        r = random.randrange(1, rows-1, 2)
-        c = random.randrange(1, cols-1, 2)
-        neighbors = []
-        if maze[r-1][c] == 1: neighbors.append((r-1,c))
-        if maze[r+1][c] == 1: neighbors.append((r+1,c))
-        if maze[r][c-1] == 1: neighbors.append((r,c-1))
-        if maze[r][c+1] == 1: neighbors.append((r,c+1))
-        if neighbors:
-            nr, nc = random.choice(neighbors)
-            maze[nr][nc] = 0
-
-# Glitch settings
-glitch_mode = False
-glitch_duration = 1.0     # seconds the glitch lasts
-glitch_timer = 0          # counts down when glitch is active
-glitch_cooldown = 5.0    # seconds before next glitch
-cooldown_timer = 0       # counts down while waiting
-
-
-# --- Entities ---
-class Player:
-    def __init__(self, x, y, image=None):
-        self.rect = pygame.Rect(x, y + INFO_BAR_HEIGHT, TILE - 5, TILE - 5)
-        self.speed = 4
-        self.color = NEON_BLUE
-        self.image = image
-        self.glitch_used = False
-        self.last_valid_position = (x, y)
-
-    def move(self, dx, dy):
-        moved = False
-        # Standard pixel-by-pixel motion (needed for powerups like speed boost)
-        if dx != 0:
-            step = 1 if dx > 0 else -1
-            for _ in range(abs(dx)):
-                if not self.collide(step, 0):
-                    self.rect.x += step
-                    moved = True
-                elif glitch_mode and not self.glitch_used:
-                    # Glitch through one tile horizontally
-                    self.last_valid_position = (self.rect.x, self.rect.y)
-                    self.rect.x += step * 2 *TILE
-                    self.glitch_used = True
-                    moved = True
-                    break
-                else:
-                    break
-
-        if dy != 0:
-            step = 1 if dy > 0 else -1
-            for _ in range(abs(dy)):
-                if not self.collide(0, step):
-                    self.rect.y += step
-                    moved = True
-                elif glitch_mode and not self.glitch_used:
-                    # Glitch through one tile vertically
-                    self.last_valid_position = (self.rect.x, self.rect.y)
-                    self.rect.y += step * 2 * TILE
-                    self.glitch_used = True
-                    moved = True
-                    break
-                else:
-                    break
-
-        # correct invalid movement
-        if self.glitch_used:
-            self.move_to_nearest_empty_space()
-
-        return moved
-    
-
-    def collide(self, dx, dy):
-        new_rect = self.rect.move(dx, dy)
-        for r in range(len(maze)):
-            for c in range(len(maze[r])):
-                if maze[r][c] == 1:
-                    wall_rect = pygame.Rect(c*TILE, r*TILE + INFO_BAR_HEIGHT, TILE, TILE)
-                    if new_rect.colliderect(wall_rect):
-                        return True
-        return False
-        
-    def move_to_nearest_empty_space(self):
-        """Snap player back to last valid position if inside a wall tile."""
-        # Get all corners of the player's rect
-        corners = [
-            (self.rect.left,  self.rect.top),
-            (self.rect.right - 1, self.rect.top),
-            (self.rect.left,  self.rect.bottom - 1),
-            (self.rect.right - 1, self.rect.bottom - 1),
-        ]
-
-        stuck = False
-        for (px, py) in corners:
-            row = (py - INFO_BAR_HEIGHT) // TILE
-            col = px // TILE
-            if not (0 <= row < len(maze) and 0 <= col < len(maze[0])) or maze[row][col] == 1:
-                    stuck = True
-                    break
-
-        if stuck and hasattr(self, "last_valid_position"):
-            self.rect.x, self.rect.y = self.last_valid_position
-
-
-    def draw(self, surface):
-        surface.blit(self.image, self.rect.topleft)
-
-
-
-class Enemy:
-    def __init__(self, x, y, speed, image=None):
-        self.rect = pygame.Rect(x, y + INFO_BAR_HEIGHT, TILE, TILE)
-        self.speed = int(speed)
-        self.direction = random.choice([(1,0),(-1,0),(0,1),(0,-1)])
-        self.image = image
-
-    def update(self):
-        dx, dy = self.direction[0], self.direction[1]  # just 1 step in a direction
-        moved = False
-
-        # Try moving one pixel at a time, up to self.speed
-        for _ in range(self.speed):
-            new_x = self.rect.x + dx
-            new_y = self.rect.y + dy
-
-            # Fix bottom boundary to account for info bar
-            if 0 <= new_x <= WIDTH - TILE and 0 <= new_y <= HEIGHT - TILE - INFO_BAR_HEIGHT:
-                if not self.collide(dx, dy):
-                    self.rect.x = new_x
-                    self.rect.y = new_y
-                    moved = True
-                else:
-                    break  # stop if collision
-            else:
-                break  # stop if out of bounds
-
-        # If enemy couldn’t move, pick a new direction
-        if not moved:
-            self.direction = random.choice([(1,0),(-1,0),(0,1),(0,-1)])
-
-    def collide(self, dx, dy):
-        new_rect = self.rect.move(dx, dy)
-        for r in range(len(maze)):
-            for c in range(len(maze[r])):
-                if maze[r][c] == 1:
-                    wall_rect = pygame.Rect(c*TILE, r*TILE + INFO_BAR_HEIGHT, TILE, TILE)
-                    if new_rect.colliderect(wall_rect):
-                        return True
-        return False
-
-    
-    def draw(self, surface):
-        surface.blit(self.image, self.rect.topleft)
-
-# --- Goal & Maze Drawing ---
-def find_farthest_free_tile(maze, player_pos):
-    rows, cols = len(maze), len(maze[0])
-    free_tiles = []
-    py, px = player_pos
-    for r in range(rows):
-        for c in range(cols):
-            if maze[r][c] == 0 and (r, c) != player_pos:  # Exclude player start
-                free_tiles.append((r, c))
-    # sort by Manhattan distance
-    free_tiles.sort(key=lambda t: abs(t[0]-py) + abs(t[1]-px), reverse=True)
-    return free_tiles[0] if free_tiles else (1,2)  # fallback to a nearby tile
-
-def draw_maze():
-    for r in range(len(maze)):
-        for c in range(len(maze[r])):
-            x, y = c*TILE, r*TILE + INFO_BAR_HEIGHT
-            if maze[r][c] == 1:
-                pygame.draw.rect(game_surface, NEON_GREEN, (x, y, TILE, TILE), 3)
-            elif maze[r][c] == 9:
-                pygame.draw.rect(game_surface, (138, 43, 226), (x, y, TILE, TILE))
-                glow_size = int(3 + 2 * abs(math.sin(glow_timer)))
-                pygame.draw.rect(game_surface, (255,0,255), (x, y, TILE, TILE), glow_size)
-
-def get_reachable_tiles(maze, start):
-    rows, cols = len(maze), len(maze[0])
-    visited = set()
-    queue = collections.deque([start])
-    visited.add(start)
-    
-    while queue:
-        r, c = queue.popleft()
-        for dr, dc in [(-1,0),(1,0),(0,-1),(0,1)]:
-            nr, nc = r+dr, c+dc
-            if (0 <= nr < rows and 0 <= nc < cols and 
-                maze[nr][nc] == 0 and (nr, nc) not in visited):
-                visited.add((nr, nc))
-                queue.append((nr, nc))
-    return visited
-# --- Add Power-ups Functions -----
-
-# In spawn_speed_boost function
-def spawn_speed_boost():
-    free_tiles = list(get_reachable_tiles(maze, (1, 1)))
-    valid_tiles = [pos for pos in free_tiles if pos != (1, 1)]
-
-    if valid_tiles:
-        r, c = random.choice(valid_tiles)
+def toggle_fullscreen():
+    """Switch between the window and desktop-sized fullscreen."""
+    global screen, is_fullscreen
+    is_fullscreen = not is_fullscreen
+    if is_fullscreen:
+        # The size of the user's monitor
+        screen = pygame.display.set_mode(pygame.display.get_desktop_sizes()[0], pygame.FULLSCREEN)
     else:
-        r, c = (1, 2)
-
-    # Add INFO_BAR_HEIGHT to the y-coordinate when spawning
-    return SpeedBoost(c * TILE, r * TILE + INFO_BAR_HEIGHT, TILE, image=speed_boost_image)
-
-# In spawn_enemy_slow function
-def spawn_enemy_slow():
-    free_tiles = list(get_reachable_tiles(maze, (1, 1)))
-    valid_tiles = [pos for pos in free_tiles if pos != (1, 1)]
-
-    if valid_tiles:
-        r, c = random.choice(valid_tiles)
-    else:
-        r, c = (1, 2)
-
-    # Add INFO_BAR_HEIGHT to the y-coordinate when spawning
-    return EnemySlow(c * TILE, r * TILE + INFO_BAR_HEIGHT, TILE, image=enemy_slow_image)
-
-
-
-# --- Reset & Game State ---
-def reset_maze(num_enemies=1):
-    global maze, player, enemies, goal_rect, goal_row, goal_col, powerups
-    
-    # Generate new maze
-    maze = make_maze(rows, cols)
-    add_loops(maze, extra_paths=10)
-
-    # Ensure player start is always free
-    maze[1][1] = 0
-
-    # Enforce borders
-    for r in range(rows):
-        maze[r][0] = maze[r][cols-1] = 1
-    for c in range(cols):
-        maze[0][c] = maze[rows-1][c] = 1
-
-    # Clear any existing goals first
-    for r in range(rows):
-        for c in range(cols):
-            if maze[r][c] == 9:
-                maze[r][c] = 0
-
-    # Find reachable tiles and place goal
-    reachable = get_reachable_tiles(maze, (1, 1))
-    valid_tiles = [pos for pos in reachable if pos != (1, 1)]
-    
-    if valid_tiles:
-        goal_row, goal_col = random.choice(valid_tiles)
-        maze[goal_row][goal_col] = 9
-        # Set goal_rect position to match player coordinate system (*WITH* INFO_BAR_HEIGHT)
-        goal_rect.x = goal_col * TILE
-        goal_rect.y = goal_row * TILE + INFO_BAR_HEIGHT
-    else:
-        # Fallback - this should rarely happen
-        goal_row, goal_col = 1, 2
-        if maze[goal_row][goal_col] == 0:
-            maze[goal_row][goal_col] = 9
-        goal_rect.x = goal_col * TILE
-        goal_rect.y = goal_row * TILE + INFO_BAR_HEIGHT
-
-    # Reset player position
-    player.rect.x = TILE
-    player.rect.y = TILE + INFO_BAR_HEIGHT
-
-    # Reset enemies
-    enemies.clear()
-    for _ in range(num_enemies):
-        # Find free tiles that aren't the player start or goal
-        free_tiles = [(r, c) for r in range(1, rows-1) for c in range(1, cols-1)
-                      if maze[r][c] == 0 and (r, c) != (1, 1) and (r, c) != (goal_row, goal_col)]
-        if free_tiles:
-            er, ec = random.choice(free_tiles)
-        else:
-            # Fallback enemy position
-            er, ec = 3, 3
-            if maze[er][ec] != 0:
-                maze[er][ec] = 0  # Force it to be walkable
-        enemies.append(Enemy(ec*TILE, er*TILE, enemy_speed, image=enemy_image))  
-
-    # --- Power-Up Cleanup ---
-    for pu in powerups:
-        # Check if the power-up has a reset method
-        if hasattr(pu, 'reset'):
-            pu.reset(player)
-
-    # --- Power-Ups ---
-    powerups.clear()  # clear old power-ups
-
-    # future fix: maybe we choose a certain power-up to appear at random
-    powerups.append(spawn_speed_boost())  # spawn one new speed boost
-    powerups.append(spawn_enemy_slow())  # spawn slow-down power-up
-
+        screen = pygame.display.set_mode((WIDTH, HEIGHT))
+    presenter.resize(screen)
+
+def read_inputs():
+    keys = pygame.key.get_pressed()
+    return Inputs(
+        left=keys[pygame.K_LEFT] or keys[pygame.K_a],
+        right=keys[pygame.K_RIGHT] or keys[pygame.K_d],
+        up=keys[pygame.K_UP] or keys[pygame.K_w],
+        down=keys[pygame.K_DOWN] or keys[pygame.K_s],
+        glitch=keys[pygame.K_SPACE],
+    )
+
+def follow_server():
+    """Co-op, while this window isn't playing: the spy stands still, and the
+    server's snapshots keep being read so it doesn't drop the connection."""
+    client.send_inputs(Inputs())
+    client.poll()
+    if client.conn.closed:
+        print("lost the connection to the co-op server")
+        quit_game()
 
 # --- Initialization ---
-rows, cols = (HEIGHT - INFO_BAR_HEIGHT)//TILE, WIDTH//TILE
-enemy_speed = 2
-player = Player(TILE, TILE, image=player_image)
-enemies = []
-goal_rect = pygame.Rect(0, 0, TILE, TILE)
-goal_row, goal_col = 0, 0
-level = 1
-score = 0
-final_score = 0
-glow_timer = 0
-powerups = []
-reset_maze(1)
+seed = args.seed if args.seed is not None else random.getrandbits(64)
+images = {
+    "player": player_image,
+    "enemy": enemy_image,
+    "speed_boost": speed_boost_image,
+    "enemy_slow": enemy_slow_image,
+}
+server = client = None
+
+def load_world():
+    """Create the World, generating the first level, or join the co-op game.
+    Runs in the background while the menu is up."""
+    global server, server_stop, client
+    # Co-op: the server runs the game and this window only sends inputs and
+    # draws the world mirrored from its snapshots
+    address = None
+    if args.host is not None or args.join:
+        from engine.net import Server, Client
+    if args.host is not None:
+        server = Server(port=args.host, seed=seed, hunter=args.hunter, expedition=args.expedition)
+        server_stop = threading.Event()
+        threading.Thread(target=server.serve, args=(server_stop,), daemon=True).start()
+        address = server.address
+        print(f"hosting co-op: the other spy runs  python main.py --join {address[0]}:{address[1]}")
+    elif args.join:
+        address = (join_host or "127.0.0.1", int(join_port))
+    if address:
+        client = Client(address, images).wait()
+        return client.world
+    return World(seed=seed, images=images, hunter=args.hunter, expedition=args.expedition,
+                 prefetch=True)  # hunter mode: drones chase the player
+
+def run_loader():
+    try:
+        world_loader.set_result(load_world())
+    except BaseException as e:
+        world_loader.set_exception(e)
+
+# A daemon thread, so closing the window while it is still connecting
+# doesn't wait for the connection to time out
+world_loader = Future()
+threading.Thread(target=run_loader, daemon=True).start()
+world = scene = None  # set by finish_startup() once the menu is dismissed
+
+def check_loaded(wait=False):
+    """Exit with a short message if load_world() couldn't set up the co-op
+    game (server not reachable, port taken). With wait, wait for it first."""
+    if not (wait or world_loader.done()):
+        return
+    error = world_loader.exception()
+    if isinstance(error, OSError):
+        what = f"join {args.join}" if args.join else f"host on port {args.host}"
+        print(f"could not {what}: {error}")
+        quit_game()
+
+def report_startup():
+    """--measure-startup: called once the menu is on screen."""
+    menu_ms = (time.perf_counter() - LAUNCHED) * 1000
+    check_loaded(wait=True)
+    world_loader.result()
+    level_ms = (time.perf_counter() - LAUNCHED) * 1000
+    print(f"startup: menu shown after {menu_ms:.0f} ms, first level ready after {level_ms:.0f} ms")
+    quit_game()
 
-# Start playing music (loop indefinitely)
-if not pygame.mixer.music.get_busy():  # avoids restarting if already playing
-    pygame.mixer.music.play(-1)
+glow_timer = 0
+accumulator = 0.0  # unsimulated time carried over between frames
+alpha = 1.0        # how far rendering is between the last two ticks
+
+# Frame profiler: F3 shows the overlay; timing is off (and free) otherwise,
+# unless a trace is being recorded
+profiler = FrameProfiler(trace_path=args.profile_trace)
+profiler_overlay = ProfilerOverlay(DEBUG_FONT, (WIDTH - 304, INFO_BAR_HEIGHT + 4))
+show_profiler = False
+
+def set_profiling(visible):
+    profiler.enabled = visible or profiler.trace is not None
+    world.profiler = scene.profiler = profiler if profiler.enabled else None
+    scene.overlay = (lambda surface: profiler_overlay.draw(surface, profiler)) if visible else None
+
+def finish_startup():
+    """Take the loaded World and set up the play screen around it."""
+    global world, recorder, scene
+    check_loaded(wait=True)
+    world = world_loader.result()
+    # Replaying the seed and the inputs logged by step() re-creates the session
+    recorder = None
+    if args.record:
+        from engine.replay import Recorder
+        recorder = world.recorder = Recorder(args.record, seed, args.hunter, args.expedition)
+        atexit.register(recorder.close)  # keep the log even if the game crashes
+    if world.expedition:
+        # The maze is bigger than the screen: draw the part around the player
+        camera = Camera((0, INFO_BAR_HEIGHT, WIDTH, HEIGHT - INFO_BAR_HEIGHT), (world.cols * TILE, world.rows * TILE))
+        maze_layer = ChunkedMazeLayer(TILE, (WIDTH, HEIGHT), camera,
+                                      BLACK, NEON_GREEN, (138, 43, 226), (255, 0, 255))
+    else:
+        camera = None
+        maze_layer = MazeLayer(TILE, (WIDTH, HEIGHT), (0, INFO_BAR_HEIGHT),
+                               BLACK, NEON_GREEN, (138, 43, 226), (255, 0, 255))
+    scene = PlayScene(game_surface, maze_layer, text_cache, HELP_FONT, NEON_BLUE, BLACK, camera)
+    set_profiling(show_profiler)
 
 # --- Main Loop ---
 running = True
 while running:
     if state == "MENU":
         draw_menu()
+        if scene is None:
+            finish_startup()
         state = "PLAYING"
-        reset_maze(1)
-    dt = 1/30
+        if not client:
+            world.reset_level()
+        clock.tick()  # don't count time spent in the menu
+    frame_time = min(clock.tick() / 1000, MAX_FRAME_TIME)
+    profiler.lap("wait")
+    profiler.next_frame()
     events = list(pygame.event.get())
 
 # ---- Check exit condition
@@ -612,17 +457,17 @@ while running:
     for event in events:
         if event.type == pygame.QUIT:
             running = False
-            pygame.mixer.music.stop()
-            pygame.quit()
-            sys.exit()
+            if pygame.mixer.get_init():
+                pygame.mixer.music.stop()
+            quit_game()
         elif event.type == pygame.KEYDOWN:
              # Fullscreen toggle is always available
             if event.key == pygame.K_f:
-                is_fullscreen = not is_fullscreen
-                if is_fullscreen:
-                    screen = pygame.display.set_mode((DESKTOP_WIDTH, DESKTOP_HEIGHT), pygame.FULLSCREEN)
-                else:
-                    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+                toggle_fullscreen()
+                scene.invalidate()
+            elif event.key == pygame.K_F3:
+                show_profiler = not show_profiler
+                set_profiling(show_profiler)
 
             if state == 'PLAYING':
                 if event.key == pygame.K_ESCAPE:
@@ -637,108 +482,53 @@ while running:
                     state = "MENU"
                 elif event.key == pygame.K_RETURN:
                     state = "PLAYING"
-                    level, enemy_speed, score = 1, 2, 0
-                    reset_maze(1)
+                    if not client:
+                        world.restart()  # (in co-op the server already has)
 
 
     if state == "PLAYING":
-        keys = pygame.key.get_pressed()
-        if keys[pygame.K_LEFT] or keys[pygame.K_a]:
-            player.move(-player.speed, 0)
-        if keys[pygame.K_RIGHT] or keys[pygame.K_d]:
-            player.move(player.speed, 0)
-        if keys[pygame.K_UP] or keys[pygame.K_w]:
-            player.move(0, -player.speed)
-        if keys[pygame.K_DOWN] or keys[pygame.K_s]:
-            player.move(0, player.speed)
-        for enemy in enemies:
-            enemy.update()
-        
-        # Check goal collision
-        if player.rect.colliderect(goal_rect):
-            level += 1
-            enemy_speed += 1
-            num_enemies = 1 + (level // 3)
-            reset_maze(num_enemies)
-            score += 1
-            
-        for enemy in enemies:
-            if player.rect.colliderect(enemy.rect):
-                enemies.clear()
+        profiler.lap("events")
+        inputs = read_inputs()
+        profiler.lap("input")
+        if client:
+            # The server simulates; apply whatever ticks it has sent
+            client.send_inputs(inputs)
+            if client.poll() == "lose":
                 state = "LOSE"
-                level = 1
-                enemy_speed = 2
-                final_score = score
-                score = 0
-                reset_maze(1)
-                break
-
-        # --- Power-Up Collision & Update ---
-        for pu in powerups:
-            if player.rect.colliderect(pu.rect) and not pu.active:
-                pu.apply(player, enemies)
-            pu.update(player, enemies)
-
-        # Handle glitch input
-        if keys[pygame.K_SPACE] and cooldown_timer <= 0 and not glitch_mode:
-            glitch_mode = True
-            glitch_timer = glitch_duration
-            cooldown_timer = glitch_cooldown
-            player.glitch_used = False
-
-        # Update glitch timers
-        if glitch_mode:
-            glitch_timer -= dt
-            if glitch_timer <= 0:
-                glitch_mode = False
+            if client.conn.closed:
+                print("lost the connection to the co-op server")
+                quit_game()
+            alpha = client.alpha()
         else:
-            if cooldown_timer > 0:
-                cooldown_timer -= dt
+            # Run as many fixed ticks as the measured frame time covers
+            accumulator += frame_time
+            while accumulator >= TICK and state == "PLAYING":
+                if world.step(inputs, TICK) == "lose":
+                    state = "LOSE"
+                accumulator -= TICK
+            alpha = min(accumulator / TICK, 1.0)
 
         # --- Draw Game Elements to the game_surface --- 
-        game_surface.fill(BLACK)
-        # Draw info bar at the top
-        font = HELP_FONT
-        text = font.render(f"Level: {level}   Enemy Speed: {enemy_speed}   Score: {score}", True, NEON_BLUE)
-        game_surface.blit(text, (10, 5))
-
-        # Draw glitch cooldown bar
-        bar_width, bar_height = 100, 10
-        bar_x, bar_y = 10, 25
-
-        if cooldown_timer > 0:
-            fill_width = int(bar_width * (1 - cooldown_timer / glitch_cooldown))
+        if DIRTY_RECTS:
+            changed = scene.draw_dirty(world, glow_timer, alpha)
         else:
-            fill_width = bar_width
-
-        pygame.draw.rect(game_surface, (50, 50, 50), (bar_x, bar_y, bar_width, bar_height))  # background
-        pygame.draw.rect(game_surface, (255, 255, 0), (bar_x, bar_y, fill_width, bar_height))  # fill
-        if glitch_mode:
-            pygame.draw.rect(game_surface, (0, 255, 0), (bar_x, bar_y, bar_width, bar_height), 2)
-
-
-        draw_maze()
-        player.draw(game_surface)
-        for enemy in enemies:
-            enemy.draw(game_surface)
-        for pu in powerups:    
-            pu.draw(game_surface)
+            scene.draw(world, glow_timer, alpha)
 
     
     elif state == "PAUSED":
         draw_pause()
     elif state == "LOSE":
-        draw_lose(final_score)
+        draw_lose(world.final_score)
+    if client and state != "PLAYING":
+        follow_server()
+    profiler.lap("draw")
 
 
     # --- Final Blit to the Display ---
-    # Clear the main window (especially important in fullscreen for the black bars)
-    screen.fill(BLACK)
-    # Calculate position to center the game_surface
-    game_rect = game_surface.get_rect(center = screen.get_rect().center)
-    # Blit the game surface onto the main screen at the calculated position
-    screen.blit(game_surface, game_rect)
-    
-    pygame.display.flip()
-    clock.tick(30)
-    glow_timer += 0.1
+    if state == "PLAYING" and DIRTY_RECTS:
+        presenter.present(game_surface, changed)
+    else:
+        scene.invalidate()
+        presenter.present(game_surface)
+    profiler.lap("present")
+    glow_timer += GLOW_SPEED * frame_time
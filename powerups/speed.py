@@ -1,42 +1,40 @@
 import pygame
+from engine.settings import TICK
 
 class SpeedBoost:
-    def __init__(self, x, y, tile_size, duration=200, image=None):
+    def __init__(self, x, y, tile_size, duration=200 * TICK, image=None):
         self.rect = pygame.Rect(x, y, tile_size + 5, tile_size + 5)
         self.duration = duration
         self.active = False
-        self.timer = 0
+        self.expiry = None  # Timer from world.effects while active
+        self.player = None  # the player sped up while active
+        self.token = None   # its modifier, to remove on expiry
         # self.image = pygame.image.load("../images/lightning_bolt.png").convert_alpha()
         # self.image = pygame.transform.scale(self.image, (tile_size, tile_size))  # scale to tile size if needed
         self.image = image
         self.color = (19, 232, 83)  # neon green
 
-    def apply(self, player, enemies):
+    def apply(self, world, player=None):
         self.active = True
-        self.timer = self.duration
-        player.speed *= 2
+        # Double the speed of the player who picked it up until the effect expires
+        self.player = player or world.player
+        self.token = self.player.modifiers.add("speed", scale=2)
+        self.expiry = world.effects.schedule(self.duration, self.remove)
         # hide power-up
         self.rect.x = -100
         self.rect.y = -100
 
-    def update(self, player, enemies):
-        if self.active:
-            self.timer -= 1
-            if self.timer <= 0:
-                self.remove(player, enemies)
-                self.active = False
-
-    def remove(self, player, enemies):
-        player.speed //= 2
-
-    def reset(self, player):
-        player.speed = 4
+    def remove(self):
+        self.player.modifiers.remove(self.token)
+        self.active = False
+        self.expiry = None
+        self.player = self.token = None
 
     # def draw(self, screen):
     #     if not self.active:
     #         pygame.draw.rect(screen, self.color, self.rect, border_radius=23)
 
-    def draw(self, screen):
+    def draw(self, screen, offset=(0, 0)):
         if not self.active:
-            screen.blit(self.image, self.rect.topleft)
+            return screen.blit(self.image, (self.rect.x - offset[0], self.rect.y - offset[1]))
 
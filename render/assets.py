@@ -0,0 +1,97 @@
+import hashlib
+import json
+import os
+
+import pygame
+
+CACHE_DIR = ".cache"
+
+
+class SpriteAtlas:
+    """All game sprites, pre-scaled to one tile and packed into one surface.
+
+    The packed atlas is cached on disk per tile size, so after the first run
+    startup decodes one small PNG instead of loading and scaling every
+    full-size source image. The cache is rebuilt whenever the tile size or
+    any source file changes. Sprites are subsurfaces of the atlas.
+    """
+
+    def __init__(self, sources, tile_size, cache_dir=CACHE_DIR):
+        self.sources = sources  # {name: image path}
+        self.tile = tile_size
+        self.cache_dir = cache_dir
+        self.surface = None
+        self.rects = {}
+
+    def _cache_key(self):
+        digest = hashlib.sha1(str(self.tile).encode())
+        for name, path in sorted(self.sources.items()):
+            stat = os.stat(path)
+            digest.update(f"{name}:{path}:{stat.st_size}:{stat.st_mtime_ns}".encode())
+        return digest.hexdigest()
+
+    def _cache_paths(self):
+        base = os.path.join(self.cache_dir, f"atlas_{self.tile}")
+        return base + ".png", base + ".json"
+
+    def load(self):
+        """Load the atlas from the disk cache, building it first if stale.
+
+        Needs a display mode to be set (for convert_alpha). Raises
+        pygame.error if a source image can't be loaded.
+        """
+        image_path, index_path = self._cache_paths()
+        key = self._cache_key()
+        try:
+            with open(index_path) as f:
+                index = json.load(f)
+            if index["key"] != key:
+                raise ValueError("stale atlas")
+            surface = pygame.image.load(image_path)
+            rects = {name: pygame.Rect(rect) for name, rect in index["sprites"].items()}
+        except (OSError, ValueError, KeyError, pygame.error):
+            surface, rects = self._build()
+            self._save(surface, rects, key)
+        self.surface = surface.convert_alpha()
+        self.rects = rects
+        return self
+
+    def _build(self):
+        tile = self.tile
+        names = sorted(self.sources)
+        surface = pygame.Surface((tile * len(names), tile), pygame.SRCALPHA)
+        rects = {}
+        for i, name in enumerate(names):
+            image = pygame.image.load(self.sources[name])
+            surface.blit(pygame.transform.scale(image, (tile, tile)), (i * tile, 0))
+            rects[name] = pygame.Rect(i * tile, 0, tile, tile)
+        return surface, rects
+
+    def _save(self, surface, rects, key):
+        image_path, index_path = self._cache_paths()
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            pygame.image.save(surface, image_path)
+            with open(index_path, "w") as f:
+                json.dump({"key": key, "sprites": {name: list(rect) for name, rect in rects.items()}}, f)
+        except (OSError, pygame.error) as e:
+            # Not fatal, the atlas just gets rebuilt next time
+            print(f"Could not cache sprite atlas: {e}")
+
+    def sprite(self, name):
+        """Surface for one sprite, sharing pixels with the atlas."""
+        return self.surface.subsurface(self.rects[name])
+
+
+class LazyFont:
+    """A pygame Font that is only opened the first time it's used."""
+
+    def __init__(self, path, size):
+        self.path = path
+        self.size_pt = size
+        self._font = None
+
+    def __getattr__(self, name):
+        if self._font is None:
+            self._font = pygame.font.Font(self.path, self.size_pt)
+        return getattr(self._font, name)
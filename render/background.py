@@ -0,0 +1,34 @@
+import pygame
+
+
+class ScrollingGrid:
+    """Pre-rendered neon grid background that scrolls vertically.
+
+    The grid and the dimming overlay are drawn once onto a surface one grid
+    period taller than the screen; scrolling is then a single sub-rect blit.
+    """
+
+    def __init__(self, size, spacing, background, line_color, dim_alpha):
+        width, height = size
+        self.size = size
+        self.spacing = spacing
+        self.surface = pygame.Surface((width, height + spacing))
+        self.surface.fill(background)
+
+        # Vertical lines
+        for x in range(0, width, spacing):
+            pygame.draw.line(self.surface, line_color, (x, 0), (x, height + spacing), 1)
+        # Horizontal lines, one period's worth extra for scrolling
+        for y in range(0, height + spacing, spacing):
+            pygame.draw.line(self.surface, line_color, (0, y), (width, y), 1)
+
+        # Overlay to dim so text pops
+        overlay = pygame.Surface(self.surface.get_size())
+        overlay.set_alpha(dim_alpha)
+        overlay.fill(background)
+        self.surface.blit(overlay, (0, 0))
+
+    def draw(self, target, offset):
+        """Blit the grid with horizontal lines shifted down by offset pixels."""
+        top = (self.spacing - int(offset)) % self.spacing
+        target.blit(self.surface, (0, 0), (0, top, *self.size))
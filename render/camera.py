@@ -0,0 +1,35 @@
+import pygame
+
+
+class Camera:
+    """Scroll position of a view onto a world larger than the screen.
+
+    view is where the world is shown on the target surface; a world point
+    (x, y) is drawn at (x - camera.x, y - camera.y). world_size is the
+    extent of the world in pixels, starting at view.topleft.
+    """
+
+    def __init__(self, view, world_size):
+        self.view = pygame.Rect(view)
+        self.world_size = world_size
+        self.x = self.y = 0
+
+    @property
+    def offset(self):
+        return self.x, self.y
+
+    def visible(self):
+        """The part of the world on screen, in world coordinates."""
+        return self.view.move(self.x, self.y)
+
+    def follow(self, center):
+        """Centre the view on center, clamped to the world edges.
+
+        Returns True if the camera moved.
+        """
+        width, height = self.world_size
+        x = min(max(center[0] - self.view.centerx, 0), max(width - self.view.width, 0))
+        y = min(max(center[1] - self.view.centery, 0), max(height - self.view.height, 0))
+        moved = (x, y) != (self.x, self.y)
+        self.x, self.y = x, y
+        return moved
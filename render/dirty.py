@@ -0,0 +1,52 @@
+class DirtyRenderer:
+    """Tracks which rects change each frame so only those get redrawn.
+
+    Sprites drawn last frame are erased by copying the background back
+    over them, and the list of changed rects is handed to
+    pygame.display.update() instead of flipping the whole screen.
+    """
+
+    def __init__(self):
+        self.background = None
+        self.full_redraw = True
+        self._restore = []  # rects to erase at the start of the next frame
+        self._dirty = []
+
+    def invalidate(self):
+        """Force the next frame to be drawn and presented in full."""
+        self.full_redraw = True
+
+    def begin(self, target, background):
+        """Start a frame: erase last frame's sprites, or the whole target
+        if a full redraw is pending or the background was replaced."""
+        if background is not self.background:
+            self.background = background
+            self.full_redraw = True
+        self._dirty = []
+        if self.full_redraw:
+            target.blit(background, (0, 0))
+        else:
+            for rect in self._restore:
+                target.blit(background, rect, rect)
+            self._dirty.extend(self._restore)
+        self._restore = []
+
+    def mark(self, rect, transient=True):
+        """Record a rect drawn this frame.
+
+        Transient rects (moving sprites) are erased again next frame;
+        persistent ones (HUD, portal glow) are left for the caller to
+        redraw when they change.
+        """
+        if rect:
+            self._dirty.append(rect)
+            if transient:
+                self._restore.append(rect)
+
+    def end(self):
+        """Finish the frame. Returns the changed rects, or None when the
+        whole surface has to be presented."""
+        if self.full_redraw:
+            self.full_redraw = False
+            return None
+        return self._dirty
@@ -0,0 +1,144 @@
+import math
+import pygame
+from engine.grid import WALL, GOAL
+
+
+class MazeLayer:
+    """Off-screen copy of the static maze, redrawn only when the maze changes.
+
+    The walls and the exit portal's base are rendered once per generated
+    maze; each frame just blits that surface and redraws the pulsing
+    portal border on top of it. The layer spans the full target surface
+    with the maze drawn at origin, so it also serves as the background
+    that sprites are erased back to.
+    """
+
+    def __init__(self, tile_size, size, origin, background, wall_color, goal_color, glow_color):
+        self.tile = tile_size
+        self.size = size
+        self.origin = origin
+        self.background = background
+        self.wall_color = wall_color
+        self.goal_color = goal_color
+        self.glow_color = glow_color
+        self.surface = None
+        self.goal_tiles = []
+        self._maze = None
+
+    def surface_for(self, maze):
+        """Return the cached layer for maze, rebuilding it if maze was replaced."""
+        if maze is not self._maze:
+            self._build(maze)
+        return self.surface
+
+    def invalidate(self):
+        self._maze = None
+
+    def _build(self, maze):
+        tile = self.tile
+        ox, oy = self.origin
+        self.surface = pygame.Surface(self.size)
+        self.surface.fill(self.background)
+        for r, c in maze.find(WALL):
+            pygame.draw.rect(self.surface, self.wall_color, (ox + c * tile, oy + r * tile, tile, tile), 3)
+        self.goal_tiles = [(ox + c * tile, oy + r * tile) for r, c in maze.find(GOAL)]
+        for x, y in self.goal_tiles:
+            pygame.draw.rect(self.surface, self.goal_color, (x, y, tile, tile))
+        self._maze = maze
+
+    def draw(self, target, maze, glow_timer):
+        """Blit the whole layer and draw the animated portal glow over it.
+
+        Returns the rects touched by the glow.
+        """
+        target.blit(self.surface_for(maze), (0, 0))
+        return self.draw_glow(target, glow_timer)
+
+    def draw_glow(self, target, glow_timer):
+        """Redraw just the portal tiles with the current glow border."""
+        glow_size = int(3 + 2 * abs(math.sin(glow_timer)))
+        dirty = []
+        for x, y in self.goal_tiles:
+            rect = pygame.Rect(x, y, self.tile, self.tile)
+            pygame.draw.rect(target, self.goal_color, rect)
+            pygame.draw.rect(target, self.glow_color, rect, glow_size)
+            dirty.append(rect)
+        return dirty
+
+
+class ChunkedMazeLayer(MazeLayer):
+    """MazeLayer for mazes larger than the screen, seen through a Camera.
+
+    The maze is cut into square chunks of chunk_tiles tiles, each rendered
+    the first time it scrolls into view. surface_for() returns a
+    target-sized background showing the visible part, recomposed only when
+    the camera or the maze changes, so the cost per frame depends on the
+    screen size rather than the maze size.
+    """
+
+    def __init__(self, tile_size, size, camera, background, wall_color, goal_color, glow_color,
+                 chunk_tiles=8):
+        super().__init__(tile_size, size, camera.view.topleft, background, wall_color, goal_color, glow_color)
+        self.camera = camera
+        self.chunk_tiles = chunk_tiles
+        self.chunks = {}       # (chunk row, chunk col) -> Surface
+        self.goals = []        # (row, col) of every portal tile in the maze
+        self._composed = None  # camera position self.surface shows
+
+    def surface_for(self, maze):
+        if maze is not self._maze:
+            self.chunks.clear()
+            self.goals = maze.find(GOAL)
+            self._maze = maze
+            self._composed = None
+        if self._composed != self.camera.offset:
+            self._compose(maze)
+        return self.surface
+
+    def invalidate(self):
+        super().invalidate()
+        self._composed = None
+
+    def _compose(self, maze):
+        if self.surface is None:
+            self.surface = pygame.Surface(self.size)
+        camera, tile = self.camera, self.tile
+        view = camera.view
+        span = self.chunk_tiles * tile
+        self.surface.fill(self.background)
+        self.surface.set_clip(view)
+        visible = camera.visible().move(-view.x, -view.y)  # in maze pixels
+        for cr in range(max(visible.top, 0) // span, (visible.bottom - 1) // span + 1):
+            for cc in range(max(visible.left, 0) // span, (visible.right - 1) // span + 1):
+                chunk = self.chunks.get((cr, cc))
+                if chunk is None:
+                    chunk = self.chunks[cr, cc] = self._build_chunk(maze, cr, cc)
+                self.surface.blit(chunk, (view.x + cc * span - camera.x, view.y + cr * span - camera.y))
+        self.surface.set_clip(None)
+        self.goal_tiles = [(view.x + c * tile - camera.x, view.y + r * tile - camera.y)
+                           for r, c in self.goals
+                           if visible.colliderect((c * tile, r * tile, tile, tile))]
+        self._composed = camera.offset
+
+    def _build_chunk(self, maze, cr, cc):
+        tile, n = self.tile, self.chunk_tiles
+        chunk = pygame.Surface((n * tile, n * tile))
+        chunk.fill(self.background)
+        for r in range(cr * n, min((cr + 1) * n, maze.rows)):
+            row = maze[r]
+            for c in range(cc * n, min((cc + 1) * n, maze.cols)):
+                x, y = (c - cc * n) * tile, (r - cr * n) * tile
+                if row[c] == WALL:
+                    pygame.draw.rect(chunk, self.wall_color, (x, y, tile, tile), 3)
+                elif row[c] == GOAL:
+                    pygame.draw.rect(chunk, self.goal_color, (x, y, tile, tile))
+        return chunk
+
+    def draw_glow(self, target, glow_timer):
+        # Portals at the edge of the view must not spill over the HUD
+        view = self.camera.view
+        clip = target.get_clip()
+        target.set_clip(view)
+        dirty = [rect.clip(view) for rect in super().draw_glow(target, glow_timer)]
+        target.set_clip(clip)
+        return dirty
@@ -0,0 +1,93 @@
+import math
+import pygame
+
+
+class Presenter:
+    """Copies the fixed-size game surface to the display, scaled to fit.
+
+    The game is always drawn at one resolution, but the window can be any
+    size (the whole desktop in fullscreen). The frame is scaled by the
+    largest factor that keeps its aspect ratio, or the largest whole one
+    with integer=True (crisper pixels, wider bars), and centred between
+    letterbox bars.
+
+    Everything depends only on the display mode, so resize() works it out
+    once: the frame is scaled straight into a subsurface of the display
+    (no per-frame surfaces), and the bars are filled only after a mode
+    change, since nothing else ever draws there.
+    """
+
+    def __init__(self, size, background, integer=False):
+        self.size = size
+        self.background = background
+        self.integer = integer
+        self.screen = None
+        self.rect = None     # where the frame goes on the screen
+        self.scale = 1
+        self.target = None   # screen subsurface at rect, when scaling
+        self.bars = []
+        self._bars_dirty = False
+
+    def resize(self, screen):
+        """Lay out the frame on a new display surface (after set_mode)."""
+        width, height = self.size
+        screen_width, screen_height = screen.get_size()
+        scale = min(screen_width / width, screen_height / height)
+        if self.integer and scale >= 1:
+            scale = math.floor(scale)
+        if abs(scale - 1) < 1e-9:
+            scale = 1
+        size = (min(round(width * scale), screen_width), min(round(height * scale), screen_height))
+        self.screen = screen
+        self.scale = scale
+        self.rect = pygame.Rect(((screen_width - size[0]) // 2, (screen_height - size[1]) // 2), size)
+        self.target = screen.subsurface(self.rect) if scale != 1 else None
+        rect = self.rect
+        bars = [
+            pygame.Rect(0, 0, screen_width, rect.top),
+            pygame.Rect(0, rect.bottom, screen_width, screen_height - rect.bottom),
+            pygame.Rect(0, rect.top, rect.left, rect.height),
+            pygame.Rect(rect.right, rect.top, screen_width - rect.right, rect.height),
+        ]
+        self.bars = [bar for bar in bars if bar.width and bar.height]
+        self._bars_dirty = True
+
+    def present(self, surface, rects=None):
+        """Show surface. With rects, only those areas of it changed."""
+        screen = self.screen
+        if self._bars_dirty:
+            for bar in self.bars:
+                screen.fill(self.background, bar)
+            self._bars_dirty = False
+            rects = None  # the bars need showing too
+        if rects is None:
+            if self.target is None:
+                screen.blit(surface, self.rect)
+            else:
+                pygame.transform.scale(surface, self.rect.size, self.target)
+            pygame.display.flip()
+            return
+
+        scale = self.scale
+        if scale == 1:
+            screen_rects = [rect.move(self.rect.topleft) for rect in rects]
+            for rect, screen_rect in zip(rects, screen_rects):
+                screen.blit(surface, screen_rect, rect)
+        elif scale == int(scale):
+            # Whole-number factor: each changed area scales on its own into
+            # exactly the pixels the full frame would give it
+            bounds, target = surface.get_rect(), self.target
+            screen_rects = []
+            for rect in rects:
+                rect = rect.clip(bounds)  # subsurface() refuses anything outside
+                if not rect.width or not rect.height:
+                    continue
+                dest = pygame.Rect(rect.x * scale, rect.y * scale, rect.width * scale, rect.height * scale)
+                pygame.transform.scale(surface.subsurface(rect), dest.size, target.subsurface(dest))
+                screen_rects.append(dest.move(self.rect.topleft))
+        else:
+            # Fractional factor: pieces scaled separately wouldn't line up
+            # pixel for pixel with their surroundings, so redo the frame
+            pygame.transform.scale(surface, self.rect.size, self.target)
+            screen_rects = [self.rect]
+        pygame.display.update(screen_rects)
@@ -0,0 +1,60 @@
+import pygame
+
+
+class ProfilerOverlay:
+    """HUD panel with a frame-time graph and per-phase p50/p95/p99 timings.
+
+    The panel is re-rendered only every refresh_frames frames and blitted
+    as a single surface in between.
+    """
+
+    def __init__(self, font, pos, width=300, graph_height=60, refresh_frames=10,
+                 text_color=(255, 255, 255), budget_ms=1000 / 60):
+        self.font = font
+        self.pos = pos
+        self.width = width
+        self.graph_height = graph_height
+        self.refresh_frames = refresh_frames
+        self.text_color = text_color
+        self.budget_ms = budget_ms  # frame time drawn as the guide line
+        self.surface = None
+        self._age = 0
+
+    def draw(self, target, profiler):
+        """Draw the panel onto target and return the rect it covers."""
+        self._age += 1
+        if self.surface is None or self._age >= self.refresh_frames:
+            self.surface = self._render(profiler)
+            self._age = 0
+        return target.blit(self.surface, self.pos)
+
+    def _render(self, profiler):
+        stats = profiler.stats()
+        line_height = self.font.get_linesize() + 2
+        lines = [f"{'phase':10s}  p50   p95   p99"]
+        for name in ["frame"] + profiler.phases:
+            if name in stats:
+                p50, p95, p99 = stats[name]
+                lines.append(f"{name[:10]:10s}{p50:5.1f} {p95:5.1f} {p99:5.1f}")
+        height = self.graph_height + 6 + line_height * len(lines)
+        surface = pygame.Surface((self.width, height), pygame.SRCALPHA)
+        surface.fill((0, 0, 0, 180))
+
+        # Frame-time graph: one column per recent frame, scaled so twice
+        # the budget fills the graph
+        totals = profiler.recent_totals()[-self.width:] * 1000
+        scale = self.graph_height / (2 * self.budget_ms)
+        x0 = self.width - len(totals)
+        for i, ms in enumerate(totals):
+            bar = min(self.graph_height, int(ms * scale))
+            color = (0, 220, 120) if ms <= self.budget_ms else (255, 60, 60)
+            pygame.draw.line(surface, color, (x0 + i, self.graph_height),
+                             (x0 + i, self.graph_height - bar))
+        budget_y = self.graph_height - int(self.budget_ms * scale)
+        pygame.draw.line(surface, (255, 255, 0), (0, budget_y), (self.width, budget_y))
+
+        y = self.graph_height + 4
+        for line in lines:
+            surface.blit(self.font.render(line, True, self.text_color), (4, y))
+            y += line_height
+        return surface
@@ -0,0 +1,161 @@
+import pygame
+from engine.settings import WIDTH, INFO_BAR_HEIGHT
+from engine.entities import lerp
+from render.dirty import DirtyRenderer
+
+
+class PlayScene:
+    """Draws the in-game frame (maze, HUD, sprites) of a World onto a surface.
+
+    draw() redraws everything; draw_dirty() only erases and redraws what
+    moved or changed and reports those rects for a partial present.
+
+    With a Camera (and a ChunkedMazeLayer following it) the maze can be
+    larger than the screen: the view follows the player, and drones and
+    power-ups outside it are not drawn at all.
+    """
+
+    def __init__(self, surface, maze_layer, text_cache, hud_font, hud_color, background, camera=None):
+        self.surface = surface
+        self.maze_layer = maze_layer
+        self.text_cache = text_cache
+        self.hud_font = hud_font
+        self.hud_color = hud_color
+        self.background = background
+        self.dirty = DirtyRenderer()
+        self._hud_shown = None  # HUD values currently on the surface
+        self.overlay = None     # optional callable(surface) -> rect, drawn on top
+        self.profiler = None    # FrameProfiler to time the draw phases with
+        self.camera = camera
+        self._maze = None       # maze the surface last showed
+
+    def invalidate(self):
+        """Force the next draw_dirty() to redraw the whole frame."""
+        self.dirty.invalidate()
+
+    def follow_player(self, world, alpha=1.0):
+        """Centre the camera on the player as drawn this frame.
+
+        Returns True if the view scrolled.
+        """
+        player = world.player
+        x, y = lerp(player.prev_topleft, player.rect.topleft, alpha)
+        return self.camera.follow((x + player.rect.width // 2, y + player.rect.height // 2))
+
+    def draw_maze(self, world, glow_timer):
+        # Walls come from the cached layer; only the portal glow is redrawn
+        return self.maze_layer.draw(self.surface, world.maze, glow_timer)
+
+    def glitch_bar_fill(self, world, bar_width):
+        if world.cooldown_timer > 0:
+            return int(bar_width * (1 - world.cooldown_timer / world.glitch_cooldown))
+        return bar_width
+
+    def draw_hud(self, world):
+        """Draw the info bar (level, score, glitch cooldown) and return its rect."""
+        surface = self.surface
+        hud_rect = pygame.Rect(0, 0, WIDTH, INFO_BAR_HEIGHT)
+        surface.fill(self.background, hud_rect)
+        text = self.text_cache.render(
+            f"Level: {world.level}   Enemy Speed: {world.enemy_speed}   Score: {world.score}",
+            self.hud_font, self.hud_color)
+        surface.blit(text, (10, 5))
+
+        # Draw glitch cooldown bar
+        bar_width, bar_height = 100, 10
+        bar_x, bar_y = 10, 25
+        fill_width = self.glitch_bar_fill(world, bar_width)
+
+        pygame.draw.rect(surface, (50, 50, 50), (bar_x, bar_y, bar_width, bar_height))  # background
+        pygame.draw.rect(surface, (255, 255, 0), (bar_x, bar_y, fill_width, bar_height))  # fill
+        if world.glitch_mode:
+            pygame.draw.rect(surface, (0, 255, 0), (bar_x, bar_y, bar_width, bar_height), 2)
+        return hud_rect
+
+    def draw_sprites(self, world, alpha=1.0):
+        """Draw players, drones and power-ups; returns the rects they cover.
+
+        Moving sprites are drawn alpha of the way between their previous
+        and current tick positions.
+        """
+        camera = self.camera
+        if camera is None:
+            rects = [player.draw(self.surface, alpha) for player in world.players if player.active]
+            for enemy in world.enemies:
+                rects.append(enemy.draw(self.surface, alpha))
+            for pu in world.powerups:
+                rects.append(pu.draw(self.surface))
+            return rects
+
+        # Only what overlaps the view; drones are looked up by their current
+        # position, so widen the view by how far they may have moved since
+        # the position they are interpolated from
+        surface, offset = self.surface, camera.offset
+        visible = camera.visible()
+        margin = int(world.drones.speed.max(initial=0))
+        clip = surface.get_clip()
+        surface.set_clip(camera.view)
+        rects = [player.draw(surface, alpha, offset) for player in world.players if player.active]
+        for i in world.drones.overlapping(visible.inflate(2 * margin, 2 * margin)):
+            rects.append(world.enemies[i].draw(surface, alpha, offset))
+        for pu in world.powerups:
+            if pu.rect.colliderect(visible):
+                rects.append(pu.draw(surface, offset))
+        surface.set_clip(clip)
+        return rects
+
+    def draw(self, world, glow_timer, alpha=1.0):
+        prof = self.profiler
+        if self.camera is not None:
+            self.follow_player(world, alpha)
+        self.draw_maze(world, glow_timer)
+        if prof:
+            prof.lap("maze")
+        self.draw_hud(world)
+        if prof:
+            prof.lap("hud")
+        self.draw_sprites(world, alpha)
+        if prof:
+            prof.lap("sprites")
+        if self.overlay:
+            self.overlay(self.surface)
+            if prof:
+                prof.lap("overlay")
+
+    def draw_dirty(self, world, glow_timer, alpha=1.0):
+        """Draw the frame by erasing and redrawing only what moved or changed.
+
+        Returns the changed rects, or None if the whole frame was redrawn.
+        """
+        dirty = self.dirty
+        prof = self.profiler
+        if self.camera is not None and self.follow_player(world, alpha):
+            # The whole view scrolled
+            dirty.invalidate()
+        if world.maze is not self._maze:
+            # A new level; a chunked layer recomposes into the same
+            # surface, so begin() can't tell the background changed
+            self._maze = world.maze
+            dirty.invalidate()
+        dirty.begin(self.surface, self.maze_layer.surface_for(world.maze))
+        for rect in self.maze_layer.draw_glow(self.surface, glow_timer):
+            dirty.mark(rect, transient=False)
+        if prof:
+            prof.lap("maze")
+        hud = (world.level, world.enemy_speed, world.score,
+               self.glitch_bar_fill(world, 100), world.glitch_mode)
+        if dirty.full_redraw or hud != self._hud_shown:
+            dirty.mark(self.draw_hud(world), transient=False)
+            self._hud_shown = hud
+        if prof:
+            prof.lap("hud")
+        for rect in self.draw_sprites(world, alpha):
+            dirty.mark(rect)
+        if prof:
+            prof.lap("sprites")
+        if self.overlay:
+            # Erased and redrawn every frame like a sprite
+            dirty.mark(self.overlay(self.surface))
+            if prof:
+                prof.lap("overlay")
+        return dirty.end()
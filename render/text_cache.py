@@ -0,0 +1,70 @@
+import collections
+import pygame
+
+GLOW_RADII = (1, 3, 5, 7)  # offsets of the blurred glow layers
+GLOW_PEAK_ALPHA = 120       # pulse alpha the glow surface is baked at
+
+
+class TextCache:
+    """LRU cache of rendered text surfaces.
+
+    Plain text is keyed by (text, font, color). Glow text is stored as one
+    pre-composited surface per string, so drawing it is a single blit with
+    only the pulse alpha changing from frame to frame.
+    """
+
+    def __init__(self, max_entries=128):
+        self.max_entries = max_entries
+        self._surfaces = collections.OrderedDict()
+
+    def render(self, text, font, color):
+        """Return font.render(text, True, color), rendering it only once."""
+        key = (text, font, color)
+        surface = self._lookup(key)
+        if surface is None:
+            surface = self._store(key, font.render(text, True, color))
+        return surface
+
+    def glow(self, text, font, glow_color):
+        """Return (surface, pad) for the blurred glow behind text.
+
+        The surface is padded by pad pixels on every side, so it should be
+        blitted at (x - pad, y - pad) and its alpha set from the pulse.
+        """
+        key = ("glow", text, font, glow_color)
+        surface = self._lookup(key)
+        if surface is None:
+            surface = self._store(key, self._compose_glow(text, font, glow_color))
+        return surface, GLOW_RADII[-1]
+
+    def _compose_glow(self, text, font, glow_color):
+        pad = GLOW_RADII[-1]
+        layer = font.render(text, True, glow_color)
+        width, height = layer.get_size()
+        surface = pygame.Surface((width + 2 * pad, height + 2 * pad), pygame.SRCALPHA)
+        # Start fully transparent but already in the glow colour, so stacking
+        # the layers only builds up alpha instead of blending towards black
+        surface.fill((*glow_color[:3], 0))
+        for radius in GLOW_RADII:
+            layer.set_alpha(GLOW_PEAK_ALPHA // radius)  # further layers are fainter
+            # Draw at 8 directions around center
+            for dx in (-radius, 0, radius):
+                for dy in (-radius, 0, radius):
+                    if dx != 0 or dy != 0:
+                        surface.blit(layer, (pad + dx, pad + dy))
+        return surface
+
+    def _lookup(self, key):
+        surface = self._surfaces.get(key)
+        if surface is not None:
+            self._surfaces.move_to_end(key)
+        return surface
+
+    def _store(self, key, surface):
+        self._surfaces[key] = surface
+        if len(self._surfaces) > self.max_entries:
+            self._surfaces.popitem(last=False)
+        return surface
+
+    def clear(self):
+        self._surfaces.clear()